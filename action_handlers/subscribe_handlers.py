@@ -22,6 +22,7 @@ from db import session_scope
 from utils import lingva_translate
 from models import BotUser, Subscription, Area, Language
 from orm import get_or_create_user, get_or_create_area
+from sqlalchemy import func
 from sqlalchemy.future import select
 from utils import detect_language_by_charset, get_translation
 from langdetect import detect, LangDetectException
@@ -43,6 +44,20 @@ def detect_language(text):
         return None
 
 
+def areas_by_first_letter_query(language, letter):
+    """
+    Selects the areas of `language` whose name starts with `letter`, case-insensitively.
+    """
+    return (
+        select(Area)
+        .filter(
+            Area.language == language,
+            func.lower(Area.name).like(f"{letter.lower()}%"),
+        )
+        .order_by(Area.name)
+    )
+
+
 async def subscribe(update: Update, context: CallbackContext) -> int:
     async with session_scope() as session:
         user = await get_or_create_user(update.effective_user, session=session)
@@ -93,11 +108,7 @@ async def select_letter(update: Update, context: CallbackContext) -> int:
         _ = translations[user.language.name]
 
         result = await session.execute(
-            select(Area)
-            .filter(
-                Area.language == user.language, Area.name.ilike(f"{selected_letter}%")
-            )
-            .order_by(Area.name)
+            areas_by_first_letter_query(user.language, selected_letter)
         )
         areas = result.scalars().all()
 
@@ -163,7 +174,7 @@ async def handle_area(update: Update, context: CallbackContext) -> int:
             if lang == user.language:
                 continue
 
-            area_name_translated = lingva_translate(
+            area_name_translated = await lingva_translate(
                 new_area.name, source_lang="auto", target_lang=lang.text
             )
             await get_or_create_area(session, area_name_translated, lang)
@@ -190,10 +201,7 @@ async def select_area(update: Update, context: CallbackContext) -> int:
             _ = translations[user.language.name]
 
             result = await session.execute(
-                select(Area)
-                .filter_by(language=user.language)
-                .filter(Area.name.ilike(f"{first_letter}%"))
-                .order_by(Area.name)
+                areas_by_first_letter_query(user.language, first_letter)
             )
             areas = result.scalars().all()
 
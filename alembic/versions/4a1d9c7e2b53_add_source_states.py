@@ -0,0 +1,49 @@
+"""add source states
+
+Revision ID: 4a1d9c7e2b53
+Revises: 76c4237dd5e3
+Create Date: 2026-10-17 10:12:41.218305
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = "4a1d9c7e2b53"
+down_revision: Union[str, None] = "76c4237dd5e3"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "source_states",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column(
+            "source",
+            postgresql.ENUM("POWER", "WATER", "GAS", name="eventtype", create_type=False),
+            nullable=False,
+        ),
+        sa.Column(
+            "language",
+            postgresql.ENUM("RU", "EN", "HY", name="language", create_type=False),
+            nullable=False,
+        ),
+        sa.Column("etag", sa.String(), nullable=True),
+        sa.Column("last_modified", sa.String(), nullable=True),
+        sa.Column("digest", sa.String(), nullable=True),
+        sa.Column("updated_time", sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint(
+            "source", "language", name="uq_source_state_source_language"
+        ),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("source_states")
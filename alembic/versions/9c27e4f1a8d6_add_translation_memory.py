@@ -0,0 +1,42 @@
+"""add translation memory
+
+Revision ID: 9c27e4f1a8d6
+Revises: 4a1d9c7e2b53
+Create Date: 2026-10-17 11:03:27.904112
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "9c27e4f1a8d6"
+down_revision: Union[str, None] = "4a1d9c7e2b53"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "translation_memory",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("source_text", sa.Text(), nullable=False),
+        sa.Column("source_language", sa.String(), nullable=False),
+        sa.Column("target_language", sa.String(), nullable=False),
+        sa.Column("translation", sa.Text(), nullable=False),
+        sa.Column("created", sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint(
+            "source_text",
+            "source_language",
+            "target_language",
+            name="uq_translation_memory_source_target",
+        ),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("translation_memory")
@@ -0,0 +1,39 @@
+"""add event digests
+
+Revision ID: a2d9e4f7b136
+Revises: c5f8a1d2e7b4
+Create Date: 2026-10-18 10:04:12.582907
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "a2d9e4f7b136"
+down_revision: Union[str, None] = "c5f8a1d2e7b4"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "event_digests",
+        sa.Column("digest", sa.LargeBinary(16), nullable=False),
+        sa.Column("created", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("digest"),
+    )
+    op.create_index(
+        op.f("ix_event_digests_created"), "event_digests", ["created"], unique=False
+    )
+    op.execute(
+        'INSERT INTO event_digests (digest, created) SELECT digest, min("timestamp") '
+        "FROM events GROUP BY digest"
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_event_digests_created"), table_name="event_digests")
+    op.drop_table("event_digests")
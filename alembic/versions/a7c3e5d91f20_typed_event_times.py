@@ -0,0 +1,58 @@
+"""typed event times
+
+Revision ID: a7c3e5d91f20
+Revises: f3a9d2c71e45
+Create Date: 2026-10-17 16:20:11.302745
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "a7c3e5d91f20"
+down_revision: Union[str, None] = "f3a9d2c71e45"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TIMEZONE = "Asia/Yerevan"
+
+
+def to_timestamp(column):
+    # Values that do not match 'DD.MM.YYYY HH:MM' become NULL instead of failing
+    return (
+        f"CASE WHEN {column} ~ '^\\d{{2}}\\.\\d{{2}}\\.\\d{{4}} \\d{{2}}:\\d{{2}}$' "
+        f"THEN to_timestamp({column}, 'DD.MM.YYYY HH24:MI')::timestamp "
+        f"AT TIME ZONE '{TIMEZONE}' END"
+    )
+
+
+def to_string(column):
+    return f"to_char({column} AT TIME ZONE '{TIMEZONE}', 'DD.MM.YYYY HH24:MI')"
+
+
+def upgrade() -> None:
+    for column in ("start_time", "end_time"):
+        op.alter_column(
+            "events",
+            column,
+            type_=sa.DateTime(timezone=True),
+            existing_type=sa.String(),
+            postgresql_using=to_timestamp(column),
+        )
+    op.create_index("idx_events_start_time", "events", ["start_time"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index("idx_events_start_time", table_name="events")
+    for column in ("start_time", "end_time"):
+        op.alter_column(
+            "events",
+            column,
+            type_=sa.String(),
+            existing_type=sa.DateTime(timezone=True),
+            postgresql_using=to_string(column),
+        )
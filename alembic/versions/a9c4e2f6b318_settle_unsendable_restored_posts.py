@@ -0,0 +1,33 @@
+"""settle unsendable restored posts
+
+Revision ID: a9c4e2f6b318
+Revises: f3a8c1e5d792
+Create Date: 2026-10-19 11:02:51.774903
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "a9c4e2f6b318"
+down_revision: Union[str, None] = "f3a8c1e5d792"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Posts sent before message ids were stored can never be edited, take them
+    # out of the restored queue
+    op.execute(
+        "UPDATE posts SET edited_time = restored_time "
+        "WHERE restored_time IS NOT NULL AND edited_time IS NULL "
+        "AND message_id IS NULL AND posted_time IS NOT NULL"
+    )
+
+
+def downgrade() -> None:
+    # Settled posts cannot be told apart from edited ones, nothing to undo
+    pass
@@ -0,0 +1,79 @@
+"""add translation memory digest
+
+Revision ID: b7e3f0c9d254
+Revises: a2d9e4f7b136
+Create Date: 2026-10-18 11:26:40.173592
+
+"""
+
+import hashlib
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "b7e3f0c9d254"
+down_revision: Union[str, None] = "a2d9e4f7b136"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 1000
+
+
+# Frozen copy of translation_memory.source_digest
+def source_digest(normalized_text):
+    return hashlib.blake2b(
+        normalized_text.encode("utf-8"), digest_size=16, person=b"translation-mem"
+    ).digest()
+
+
+def upgrade() -> None:
+    op.add_column(
+        "translation_memory",
+        sa.Column("source_digest", sa.LargeBinary(16), nullable=True),
+    )
+
+    # Stored source texts are already normalized
+    connection = op.get_bind()
+    last_id = 0
+    while True:
+        rows = connection.execute(
+            sa.text(
+                "SELECT id, source_text FROM translation_memory "
+                "WHERE id > :last_id ORDER BY id LIMIT :limit"
+            ),
+            {"last_id": last_id, "limit": BATCH_SIZE},
+        ).fetchall()
+        if not rows:
+            break
+
+        connection.execute(
+            sa.text(
+                "UPDATE translation_memory SET source_digest = :digest WHERE id = :id"
+            ),
+            [{"id": row.id, "digest": source_digest(row.source_text)} for row in rows],
+        )
+        last_id = rows[-1].id
+
+    op.alter_column("translation_memory", "source_digest", nullable=False)
+    op.drop_constraint(
+        "uq_translation_memory_source_target", "translation_memory", type_="unique"
+    )
+    op.create_unique_constraint(
+        "uq_translation_memory_source_target",
+        "translation_memory",
+        ["source_digest", "source_language", "target_language"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_constraint(
+        "uq_translation_memory_source_target", "translation_memory", type_="unique"
+    )
+    op.create_unique_constraint(
+        "uq_translation_memory_source_target",
+        "translation_memory",
+        ["source_text", "source_language", "target_language"],
+    )
+    op.drop_column("translation_memory", "source_digest")
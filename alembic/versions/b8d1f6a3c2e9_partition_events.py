@@ -0,0 +1,148 @@
+"""partition events
+
+Revision ID: b8d1f6a3c2e9
+Revises: a7c3e5d91f20
+Create Date: 2026-10-17 17:45:03.918264
+
+"""
+
+from datetime import date, timedelta
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "b8d1f6a3c2e9"
+down_revision: Union[str, None] = "a7c3e5d91f20"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+PARTITIONS_AHEAD = 3
+
+
+def create_partitions(parent, table, first_day, last_day):
+    # Frozen copy of the naming in partitions.py
+    op.execute(f"CREATE TABLE {table}_default PARTITION OF {parent} DEFAULT")
+    day = first_day
+    while day <= last_day:
+        op.execute(
+            f"CREATE TABLE {table}_p{day:%Y%m%d} PARTITION OF {parent} "
+            f"FOR VALUES FROM ('{day.isoformat()}') "
+            f"TO ('{(day + timedelta(days=1)).isoformat()}')"
+        )
+        day += timedelta(days=1)
+
+
+def create_common_constraints():
+    op.create_index("idx_events_digest", "events", ["digest"], unique=False)
+    op.create_index("idx_events_timestamp", "events", ["timestamp"], unique=False)
+    op.create_index("idx_events_start_time", "events", ["start_time"], unique=False)
+    op.create_foreign_key(
+        "post_event_association_post_id_fkey",
+        "post_event_association",
+        "posts",
+        ["post_id"],
+        ["id"],
+        ondelete="CASCADE",
+    )
+
+
+def upgrade() -> None:
+    connection = op.get_bind()
+    op.execute('UPDATE events SET "timestamp" = now() WHERE "timestamp" IS NULL')
+    first_day = (
+        connection.execute(
+            sa.text('SELECT min("timestamp")::date FROM events')
+        ).scalar()
+        or date.today()
+    )
+    last_day = date.today() + timedelta(days=PARTITIONS_AHEAD)
+
+    op.execute(
+        "CREATE TABLE events_partitioned (LIKE events INCLUDING DEFAULTS) "
+        'PARTITION BY RANGE ("timestamp")'
+    )
+    op.execute('ALTER TABLE events_partitioned ALTER COLUMN "timestamp" SET NOT NULL')
+    op.execute(
+        "CREATE TABLE post_event_association_partitioned ("
+        "post_id integer NOT NULL, "
+        "event_id integer NOT NULL, "
+        "event_timestamp timestamp without time zone NOT NULL"
+        ") PARTITION BY RANGE (event_timestamp)"
+    )
+    create_partitions("events_partitioned", "events", first_day, last_day)
+    create_partitions(
+        "post_event_association_partitioned",
+        "post_event_association",
+        first_day,
+        last_day,
+    )
+
+    op.execute("INSERT INTO events_partitioned SELECT * FROM events")
+    op.execute(
+        "INSERT INTO post_event_association_partitioned "
+        'SELECT a.post_id, a.event_id, e."timestamp" '
+        "FROM post_event_association a JOIN events e ON e.id = a.event_id"
+    )
+
+    op.execute("ALTER SEQUENCE events_id_seq OWNED BY NONE")
+    op.drop_table("post_event_association")
+    op.drop_table("events")
+    op.rename_table("events_partitioned", "events")
+    op.rename_table("post_event_association_partitioned", "post_event_association")
+    op.execute("ALTER SEQUENCE events_id_seq OWNED BY events.id")
+
+    op.create_primary_key("events_pkey", "events", ["id", "timestamp"])
+    op.create_primary_key(
+        "post_event_association_pkey",
+        "post_event_association",
+        ["post_id", "event_id", "event_timestamp"],
+    )
+    create_common_constraints()
+    op.create_foreign_key(
+        "post_event_association_event_fkey",
+        "post_event_association",
+        "events",
+        ["event_id", "event_timestamp"],
+        ["id", "timestamp"],
+        ondelete="CASCADE",
+    )
+
+
+def downgrade() -> None:
+    op.execute("CREATE TABLE events_plain (LIKE events INCLUDING DEFAULTS)")
+    op.execute(
+        "CREATE TABLE post_event_association_plain ("
+        "post_id integer NOT NULL, "
+        "event_id integer NOT NULL)"
+    )
+    op.execute("INSERT INTO events_plain SELECT * FROM events")
+    op.execute(
+        "INSERT INTO post_event_association_plain "
+        "SELECT DISTINCT post_id, event_id FROM post_event_association"
+    )
+
+    op.execute("ALTER SEQUENCE events_id_seq OWNED BY NONE")
+    op.drop_table("post_event_association")
+    op.drop_table("events")
+    op.rename_table("events_plain", "events")
+    op.rename_table("post_event_association_plain", "post_event_association")
+    op.execute("ALTER SEQUENCE events_id_seq OWNED BY events.id")
+    op.execute('ALTER TABLE events ALTER COLUMN "timestamp" DROP NOT NULL')
+
+    op.create_primary_key("events_pkey", "events", ["id"])
+    op.create_primary_key(
+        "post_event_association_pkey", "post_event_association", ["post_id", "event_id"]
+    )
+    create_common_constraints()
+    op.drop_index("idx_events_digest", table_name="events")
+    op.create_index("uq_events_digest", "events", ["digest"], unique=True)
+    op.create_foreign_key(
+        "post_event_association_event_id_fkey",
+        "post_event_association",
+        "events",
+        ["event_id"],
+        ["id"],
+        ondelete="CASCADE",
+    )
@@ -0,0 +1,27 @@
+"""add source state snapshot
+
+Revision ID: c5e8a3b0d914
+Revises: 9c27e4f1a8d6
+Create Date: 2026-10-17 12:20:09.551864
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "c5e8a3b0d914"
+down_revision: Union[str, None] = "9c27e4f1a8d6"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("source_states", sa.Column("snapshot", sa.JSON(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("source_states", "snapshot")
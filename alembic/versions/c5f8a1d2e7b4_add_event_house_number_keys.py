@@ -0,0 +1,80 @@
+"""add event house number keys
+
+Revision ID: c5f8a1d2e7b4
+Revises: e6a0c4b83d57
+Create Date: 2026-10-17 21:12:47.305116
+
+"""
+
+import re
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "c5f8a1d2e7b4"
+down_revision: Union[str, None] = "e6a0c4b83d57"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 1000
+
+# Frozen copy of utils.natural_sort_key and utils.split_house_numbers
+NATURAL_SORT_WIDTH = 10
+NATURAL_SORT_DIGITS_RE = re.compile(r"\d+")
+
+
+def natural_sort_key(value):
+    return NATURAL_SORT_DIGITS_RE.sub(
+        lambda match: match.group().zfill(NATURAL_SORT_WIDTH), value.lower()
+    )
+
+
+def split_house_numbers(house_numbers):
+    numbers = {number.strip() for number in (house_numbers or "").split(",")}
+    numbers.discard("")
+    numbers = sorted(numbers, key=lambda number: (natural_sort_key(number), number))
+    return numbers, [natural_sort_key(number) for number in numbers]
+
+
+def upgrade() -> None:
+    op.add_column(
+        "events", sa.Column("house_numbers", sa.ARRAY(sa.String()), nullable=True)
+    )
+    op.add_column(
+        "events", sa.Column("house_number_keys", sa.ARRAY(sa.String()), nullable=True)
+    )
+
+    connection = op.get_bind()
+    update = sa.text(
+        "UPDATE events SET house_numbers = :numbers, house_number_keys = :keys "
+        "WHERE id = :id"
+    ).bindparams(
+        sa.bindparam("numbers", type_=sa.ARRAY(sa.String())),
+        sa.bindparam("keys", type_=sa.ARRAY(sa.String())),
+    )
+    last_id = 0
+    while True:
+        rows = connection.execute(
+            sa.text(
+                "SELECT id, house_number FROM events "
+                "WHERE id > :last_id AND event_type = 'POWER' "
+                "ORDER BY id LIMIT :limit"
+            ),
+            {"last_id": last_id, "limit": BATCH_SIZE},
+        ).fetchall()
+        if not rows:
+            break
+
+        params = []
+        for row in rows:
+            numbers, keys = split_house_numbers(row.house_number)
+            params.append({"id": row.id, "numbers": numbers, "keys": keys})
+        connection.execute(update, params)
+        last_id = rows[-1].id
+
+
+def downgrade() -> None:
+    op.drop_column("events", "house_number_keys")
+    op.drop_column("events", "house_numbers")
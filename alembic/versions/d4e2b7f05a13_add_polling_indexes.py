@@ -0,0 +1,55 @@
+"""add polling indexes
+
+Revision ID: d4e2b7f05a13
+Revises: b8d1f6a3c2e9
+Create Date: 2026-10-17 19:12:40.661093
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "d4e2b7f05a13"
+down_revision: Union[str, None] = "b8d1f6a3c2e9"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "idx_posts_unsent",
+        "posts",
+        ["post_type", "creation_time"],
+        unique=False,
+        postgresql_where=sa.text("posted_time IS NULL"),
+    )
+    op.create_index(
+        "idx_posts_restored_unedited",
+        "posts",
+        ["post_type", "restored_time"],
+        unique=False,
+        postgresql_where=sa.text("restored_time IS NOT NULL AND edited_time IS NULL"),
+    )
+    op.create_index(
+        "idx_events_unprocessed",
+        "events",
+        ["event_type", "language", "planned", "id"],
+        unique=False,
+        postgresql_where=sa.text("processed IS false"),
+    )
+    op.create_index(
+        "idx_areas_language_name_prefix",
+        "areas",
+        ["language", sa.text("lower(name) text_pattern_ops")],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("idx_areas_language_name_prefix", table_name="areas")
+    op.drop_index("idx_events_unprocessed", table_name="events")
+    op.drop_index("idx_posts_restored_unedited", table_name="posts")
+    op.drop_index("idx_posts_unsent", table_name="posts")
@@ -0,0 +1,33 @@
+"""add outage resolution
+
+Revision ID: e1f4b7a62c08
+Revises: c5e8a3b0d914
+Create Date: 2026-10-17 13:41:52.117430
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "e1f4b7a62c08"
+down_revision: Union[str, None] = "c5e8a3b0d914"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("events", sa.Column("resolved_time", sa.DateTime(), nullable=True))
+    op.add_column("posts", sa.Column("message_id", sa.BigInteger(), nullable=True))
+    op.add_column("posts", sa.Column("restored_time", sa.DateTime(), nullable=True))
+    op.add_column("posts", sa.Column("edited_time", sa.DateTime(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("posts", "edited_time")
+    op.drop_column("posts", "restored_time")
+    op.drop_column("posts", "message_id")
+    op.drop_column("events", "resolved_time")
@@ -0,0 +1,26 @@
+"""add source state watermark
+
+Revision ID: e6a0c4b83d57
+Revises: d4e2b7f05a13
+Create Date: 2026-10-17 21:03:27.408156
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "e6a0c4b83d57"
+down_revision: Union[str, None] = "d4e2b7f05a13"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("source_states", sa.Column("watermark", sa.JSON(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("source_states", "watermark")
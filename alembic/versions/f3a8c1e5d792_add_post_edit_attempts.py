@@ -0,0 +1,30 @@
+"""add post edit attempts
+
+Revision ID: f3a8c1e5d792
+Revises: b7e3f0c9d254
+Create Date: 2026-10-19 10:14:08.529361
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "f3a8c1e5d792"
+down_revision: Union[str, None] = "b7e3f0c9d254"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "posts",
+        sa.Column("edit_attempts", sa.Integer(), nullable=False, server_default="0"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("posts", "edit_attempts")
@@ -0,0 +1,89 @@
+"""add event digest
+
+Revision ID: f3a9d2c71e45
+Revises: e1f4b7a62c08
+Create Date: 2026-10-17 15:02:38.540118
+
+"""
+
+import hashlib
+import os
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "f3a9d2c71e45"
+down_revision: Union[str, None] = "e1f4b7a62c08"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 1000
+
+# Frozen copy of utils.compute_event_digest, version 1
+EVENT_HASH_VERSION = 1
+EVENT_HASH_KEY = os.getenv("EVENT_HASH_KEY", "armenia-outages").encode("utf-8")
+
+
+def event_digest(*fields):
+    digest = hashlib.blake2b(digest_size=16, key=EVENT_HASH_KEY, person=b"outage-event")
+    digest.update(bytes((EVENT_HASH_VERSION,)))
+    for field in fields:
+        encoded = field.encode("utf-8")
+        digest.update(len(encoded).to_bytes(4, "big"))
+        digest.update(encoded)
+    return digest.digest()
+
+
+def row_digest(row):
+    # Stored fields are already normalized, so they hash exactly like at ingest
+    if row.event_type == "POWER":
+        return event_digest(
+            "POWER",
+            row.area or "",
+            row.district or "",
+            row.house_number or "",
+            row.start_time or "",
+            row.language or "",
+            "TRUE" if row.planned else "",
+        )
+    return event_digest(row.text or "")
+
+
+def upgrade() -> None:
+    op.add_column("events", sa.Column("digest", sa.LargeBinary(16), nullable=True))
+
+    connection = op.get_bind()
+    last_id = 0
+    while True:
+        rows = connection.execute(
+            sa.text(
+                "SELECT id, event_type::text AS event_type, language::text AS language, "
+                "area, district, house_number, start_time, planned, text "
+                "FROM events WHERE id > :last_id ORDER BY id LIMIT :limit"
+            ),
+            {"last_id": last_id, "limit": BATCH_SIZE},
+        ).fetchall()
+        if not rows:
+            break
+
+        connection.execute(
+            sa.text("UPDATE events SET digest = :digest WHERE id = :id"),
+            [{"id": row.id, "digest": row_digest(row)} for row in rows],
+        )
+        last_id = rows[-1].id
+
+    op.alter_column("events", "digest", nullable=False)
+    op.create_index("uq_events_digest", "events", ["digest"], unique=True)
+    op.drop_constraint("_event_hash_uc", "events", type_="unique")
+    op.drop_column("events", "hash")
+
+
+def downgrade() -> None:
+    op.add_column("events", sa.Column("hash", sa.String(), nullable=True))
+    op.execute("UPDATE events SET hash = encode(digest, 'hex')")
+    op.alter_column("events", "hash", nullable=False)
+    op.create_unique_constraint("_event_hash_uc", "events", ["hash"])
+    op.drop_index("uq_events_digest", table_name="events")
+    op.drop_column("events", "digest")
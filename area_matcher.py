@@ -0,0 +1,147 @@
+from collections import deque
+from typing import NamedTuple, Optional
+from area_registry import AreaRecord, area_registry
+from normalization import normalize_text
+
+
+class AhoCorasick:
+    """
+    Aho-Corasick automaton finding every occurrence of many patterns in one pass.
+
+    Patterns can be added at any time; failure links are recomputed lazily on the
+    next search after an addition.
+    """
+
+    def __init__(self):
+        self._goto = [{}]
+        self._fail = [0]
+        self._outputs = [[]]
+        # Nearest node on the failure chain that ends a pattern
+        self._output_link = [0]
+        self._dirty = False
+
+    def add(self, pattern, value):
+        node = 0
+        for char in pattern:
+            next_node = self._goto[node].get(char)
+            if next_node is None:
+                next_node = len(self._goto)
+                self._goto.append({})
+                self._fail.append(0)
+                self._outputs.append([])
+                self._output_link.append(0)
+                self._goto[node][char] = next_node
+            node = next_node
+        self._outputs[node].append((len(pattern), value))
+        self._dirty = True
+
+    def _build(self):
+        queue = deque()
+        for child in self._goto[0].values():
+            self._fail[child] = 0
+            self._output_link[child] = 0
+            queue.append(child)
+
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                fail = self._fail[node]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                fail = self._goto[fail].get(char, 0)
+                self._fail[child] = fail
+                self._output_link[child] = (
+                    fail if self._outputs[fail] else self._output_link[fail]
+                )
+                queue.append(child)
+
+        self._dirty = False
+
+    def search(self, text):
+        """
+        Yields (start, end, value) for every pattern occurrence in `text`.
+        """
+        if self._dirty:
+            self._build()
+
+        node = 0
+        for position, char in enumerate(text):
+            while node and char not in self._goto[node]:
+                node = self._fail[node]
+            node = self._goto[node].get(char, 0)
+
+            match_node = node if self._outputs[node] else self._output_link[node]
+            while match_node:
+                for length, value in self._outputs[match_node]:
+                    yield position - length + 1, position + 1, value
+                match_node = self._output_link[match_node]
+
+
+class AreaMatch(NamedTuple):
+    """
+    An area mentioned in a text, with its position in the normalized text.
+    """
+
+    area: AreaRecord
+    start: int
+    end: int
+
+
+def most_specific(matches) -> Optional[AreaMatch]:
+    """
+    Returns the longest match, the earliest one among equally long matches.
+    """
+    if not matches:
+        return None
+    return max(matches, key=lambda match: (match.end - match.start, -match.start))
+
+
+class AreaMatcher:
+    """
+    Per-language automata over the area names of the area registry.
+
+    New areas are added to the existing automaton, a reload of the registry rebuilds
+    it from scratch.
+    """
+
+    def __init__(self, registry):
+        self._registry = registry
+        self._generation = registry.generation
+        self._automata = {}
+        self._indexed = {}
+
+    async def _automaton(self, session, language):
+        areas = await self._registry.areas_for_language(session, language)
+        if self._generation != self._registry.generation:
+            self._generation = self._registry.generation
+            self._automata.clear()
+            self._indexed.clear()
+
+        automaton = self._automata.setdefault(language, AhoCorasick())
+        for area in areas[self._indexed.get(language, 0) :]:
+            pattern = normalize_text(area.name)
+            if pattern:
+                automaton.add(pattern, area)
+        self._indexed[language] = len(areas)
+        return automaton
+
+    async def find_all(self, session, text, language):
+        """
+        Returns every area mentioned in `text`, ordered by position. Positions refer
+        to the normalized text.
+        """
+        automaton = await self._automaton(session, language)
+        matches = [
+            AreaMatch(area, start, end)
+            for start, end, area in automaton.search(normalize_text(text))
+        ]
+        return sorted(matches, key=lambda match: (match.start, -match.end))
+
+    async def find_best(self, session, text, language) -> Optional[AreaMatch]:
+        """
+        Returns the most specific area mentioned in `text`.
+        """
+        return most_specific(await self.find_all(session, text, language))
+
+
+area_matcher = AreaMatcher(area_registry)
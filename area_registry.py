@@ -0,0 +1,113 @@
+import asyncio
+import logging
+from typing import NamedTuple
+from sqlalchemy import event
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.future import select
+from models import Area, Language
+
+logger = logging.getLogger(__name__)
+
+
+class AreaRecord(NamedTuple):
+    """
+    Immutable copy of an Area row, safe to share between sessions.
+    """
+
+    id: int
+    name: str
+    language: Language
+
+
+class AreaRegistry:
+    """
+    Process-wide cache of all areas, loaded once and kept up to date as areas are added.
+
+    Lookups by (name, language) are served from memory. `generation` changes
+    whenever the registry is reloaded, so derived structures know when to rebuild
+    themselves rather than extend.
+    """
+
+    def __init__(self):
+        self._areas = {}
+        self._by_language = {}
+        self._loaded = False
+        self._lock = asyncio.Lock()
+        self.generation = 0
+
+    async def _ensure_loaded(self, session):
+        if self._loaded:
+            return
+        async with self._lock:
+            if self._loaded:
+                return
+            result = await session.execute(select(Area.id, Area.name, Area.language))
+            for row in result.all():
+                self._add(AreaRecord(*row))
+            self._loaded = True
+            logger.info(f"Loaded {len(self._areas)} areas into the area registry.")
+
+    def _add(self, record):
+        key = (record.name, record.language)
+        if key in self._areas:
+            return
+        self._areas[key] = record
+        self._by_language.setdefault(record.language, []).append(record)
+
+    def invalidate(self):
+        """
+        Drops the cached areas, the next lookup reloads them from the database.
+        """
+        self._areas.clear()
+        self._by_language.clear()
+        self._loaded = False
+        self.generation += 1
+
+    async def get(self, session, name, language):
+        await self._ensure_loaded(session)
+        return self._areas.get((name, language))
+
+    async def areas_for_language(self, session, language):
+        await self._ensure_loaded(session)
+        return list(self._by_language.get(language, ()))
+
+    async def get_or_create(self, session, name, language):
+        """
+        Returns the area with the given name, creating it with a single upsert in a
+        savepoint of the caller's transaction.
+
+        Area names are unique across languages, so an existing area with the same
+        name is returned even when it was stored for another language. If the
+        caller's transaction rolls back, the registry is reloaded on the next lookup.
+        """
+        record = await self.get(session, name, language)
+        if record:
+            return record
+
+        statement = insert(Area).values(name=name, language=language)
+        async with session.begin_nested():
+            result = await session.execute(
+                statement.on_conflict_do_update(
+                    index_elements=[Area.name], set_={"name": statement.excluded.name}
+                ).returning(Area.id, Area.name, Area.language)
+            )
+            record = AreaRecord(*result.one())
+
+        if record.language != language:
+            logger.warning(
+                f"Area {name} requested for {language.name} already exists "
+                f"for {record.language.name}."
+            )
+
+        event.listen(
+            session.sync_session,
+            "after_rollback",
+            lambda _: self.invalidate(),
+            once=True,
+        )
+        self._add(record)
+        self._areas.setdefault((name, language), record)
+        return record
+
+
+area_registry = AreaRegistry()
@@ -0,0 +1,59 @@
+"""
+Compare the normalization module with the previous str.replace / re.sub implementations.
+
+Usage: python -m benchmarks.bench_normalization
+"""
+
+import timeit
+from normalization import (
+    _apply_corrections,
+    _normalize_string,
+    detect_language_by_charset,
+    escape_markdown_v2,
+    normalize_value,
+)
+from tests.address_corpus import generate_addresses
+from tests.test_normalization import (
+    reference_detect_language_by_charset,
+    reference_escape_markdown_v2,
+    reference_normalize_value,
+)
+
+
+def rate(func, values, number=5, clear_caches=False):
+    def run():
+        if clear_caches:
+            for cached in (_normalize_string, _apply_corrections, detect_language_by_charset):
+                cached.cache_clear()
+        for value in values:
+            func(value)
+
+    return len(values) * number / timeit.timeit(run, number=number)
+
+
+def report(name, reference, func, values):
+    before = rate(reference, values)
+    cold = rate(func, values, clear_caches=True)
+    warm = rate(func, values)
+    print(f"{name}")
+    print(f"  previous: {before:,.0f} calls/s")
+    print(f"  cold:     {cold:,.0f} calls/s ({cold / before:.1f}x)")
+    print(f"  memoized: {warm:,.0f} calls/s ({warm / before:.1f}x)")
+
+
+def main():
+    fragments = [part for a in generate_addresses(5000) for part in a.split(",")]
+    post = "⚡️ Emergency power outage ⚡️\n\nг.ЕРЕВАН\n15.10.2026 10:00\n\n" * 40
+
+    report("normalize_value", reference_normalize_value, normalize_value, fragments)
+    report(
+        "detect_language_by_charset",
+        reference_detect_language_by_charset,
+        detect_language_by_charset,
+        fragments,
+    )
+    report("escape_markdown_v2", reference_escape_markdown_v2, escape_markdown_v2, [post] * 200)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+Compare the BeautifulSoup and lxml extraction paths of the ENA outage table.
+
+Usage: python -m benchmarks.bench_power_table [saved_page.html ...]
+"""
+
+import os
+import sys
+import timeit
+from bs4 import BeautifulSoup
+from parsers.power_parser import OUTAGE_TABLE_ID, extract_table_rows
+
+DEFAULT_PAGES = [
+    os.path.join(
+        os.path.dirname(__file__), "..", "tests", "data", "ena_emergency_ru.html"
+    )
+]
+
+
+def reference_extract_table_rows(html):
+    """
+    The BeautifulSoup table extraction replaced by `extract_table_rows`, kept as the
+    reference for its output and speed.
+    """
+    table = BeautifulSoup(html, "html.parser").find("table", {"id": OUTAGE_TABLE_ID})
+    if table is None:
+        return []
+    return [
+        [cell.text.strip() for cell in row.find_all("td")]
+        for row in table.find("tbody").find_all("tr")
+    ]
+
+
+def soup_path(html):
+    return reference_extract_table_rows(html)
+
+
+def lxml_path(html):
+    return extract_table_rows(html)
+
+
+def main(paths, number=20):
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            html = f.read()
+
+        assert [list(row) for row in lxml_path(html)] == soup_path(html)
+
+        soup_time = timeit.timeit(lambda: soup_path(html), number=number) / number
+        lxml_time = timeit.timeit(lambda: lxml_path(html), number=number) / number
+
+        print(f"{os.path.basename(path)} ({len(html)} chars)")
+        print(f"  BeautifulSoup: {soup_time * 1000:.2f} ms/page")
+        print(f"  lxml:          {lxml_time * 1000:.2f} ms/page")
+        print(f"  speedup:       {soup_time / lxml_time:.1f}x")
+
+
+if __name__ == "__main__":
+    import logging
+
+    logging.disable(logging.INFO)
+    main(sys.argv[1:] or DEFAULT_PAGES)
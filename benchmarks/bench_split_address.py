@@ -0,0 +1,32 @@
+"""
+Measure split_address throughput on the generated address corpus.
+
+Usage: python -m benchmarks.bench_split_address [rows]
+"""
+
+import sys
+import timeit
+from parsers.power_parser import split_address
+from tests.address_corpus import generate_addresses
+from tests.test_power_parser import reference_split_address
+
+
+def measure(func, addresses, number=5):
+    seconds = timeit.timeit(lambda: [func(a) for a in addresses], number=number)
+    return len(addresses) * number / seconds
+
+
+def main(count=20000):
+    addresses = generate_addresses(count)
+
+    reference_rate = measure(reference_split_address, addresses)
+    rate = measure(split_address, addresses)
+
+    print(f"{len(addresses)} addresses")
+    print(f"  regex cascade: {reference_rate:,.0f} rows/s")
+    print(f"  single pass:   {rate:,.0f} rows/s")
+    print(f"  speedup:       {rate / reference_rate:.1f}x")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20000)
@@ -15,10 +15,13 @@ from telegram.error import Forbidden, NetworkError
 from config import (
     CHECK_FOR_POWER_UPDATES_INTERVAL,
     CHECK_FOR_WATER_UPDATES_INTERVAL,
+    PARTITION_MAINTENANCE_INTERVAL,
     POST_UPDATES_INTERVAL,
     TOKEN,
 )
 from db import init_db
+from http_client import close_http_session, init_http_session
+from partitions import maintain_event_partitions
 from action_handlers.handlers import (
     start,
     set_language,
@@ -30,15 +33,13 @@ from action_handlers.subscribe_handlers import (
     unsubscribe_callback,
 )
 from tasks import (
-    cleanup_outdated_events,
+    rotate_event_partitions,
     send_emergency_power_posts,
     send_water_posts,
     update_and_create_power_posts,
     update_and_create_water_posts,
 )
 
-THREE_DAYS_IN_SECONDS = 3 * 24 * 60 * 60  # 259200 sec
-
 nest_asyncio.apply()
 
 logging.basicConfig(
@@ -83,6 +84,8 @@ async def periodic_task(interval, task_func, context: CallbackContext):
 
 async def main() -> None:
     await init_db()
+    await maintain_event_partitions()
+    await init_http_session()
     limits = httpx.Limits(max_keepalive_connections=50, max_connections=100)
     timeout = httpx.Timeout(20.0)
 
@@ -128,7 +131,7 @@ async def main() -> None:
     )
     asyncio.create_task(periodic_task(POST_UPDATES_INTERVAL, send_water_posts, context))
     asyncio.create_task(
-        periodic_task(THREE_DAYS_IN_SECONDS, cleanup_outdated_events, context)
+        periodic_task(PARTITION_MAINTENANCE_INTERVAL, rotate_event_partitions, context)
     )
 
     loop = asyncio.get_running_loop()
@@ -148,6 +151,7 @@ async def main() -> None:
     await application.stop()
     await application.shutdown()
     await httpx_client.aclose()
+    await close_http_session()
     logger.info("Application stopped gracefully")
 
 
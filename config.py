@@ -19,6 +19,9 @@ CHANNEL_ID_HY = os.getenv("CHANNEL_ID_HY")
 CHANNEL_ID_RU = os.getenv("CHANNEL_ID_RU")
 CHANNEL_ID_EN = os.getenv("CHANNEL_ID_EN")
 
+# Time zone of the outage times published by the utilities
+TIMEZONE = os.getenv("TIMEZONE", "Asia/Yerevan")
+
 # URLs for parsing
 POWER_OUTAGE_URL = "https://www.ena.am/Info.aspx?id=5&lang={lang}"
 WATER_OUTAGE_URL = "https://interactive.vjur.am/"
@@ -31,3 +34,43 @@ CHECK_FOR_WATER_UPDATES_INTERVAL = int(
     os.getenv("CHECK_FOR_WATER_UPDATES_INTERVAL", 3600)
 )
 POST_UPDATES_INTERVAL = int(os.getenv("POST_UPDATES_INTERVAL", 180))
+# Failed edits of a channel post after which it is no longer edited
+MAX_POST_EDIT_ATTEMPTS = int(os.getenv("MAX_POST_EDIT_ATTEMPTS", 5))
+
+# How long an emergency power outage stays relevant after it started
+POWER_EVENT_WINDOW_HOURS = int(os.getenv("POWER_EVENT_WINDOW_HOURS", 24))
+# Emergency outages of an area starting within this many minutes share one post
+POWER_COALESCE_WINDOW_MINUTES = int(os.getenv("POWER_COALESCE_WINDOW_MINUTES", 15))
+# How long events are kept in the database
+EVENT_RETENTION_DAYS = int(os.getenv("EVENT_RETENTION_DAYS", 3))
+# Number of daily event partitions created ahead of time
+EVENT_PARTITIONS_AHEAD = int(os.getenv("EVENT_PARTITIONS_AHEAD", 3))
+# How often event partitions are created and dropped
+PARTITION_MAINTENANCE_INTERVAL = int(os.getenv("PARTITION_MAINTENANCE_INTERVAL", 21600))
+
+# Per-language timeout for a single emergency power parsing run
+POWER_PARSE_TIMEOUT = int(os.getenv("POWER_PARSE_TIMEOUT", 120))
+
+# Shared HTTP transport for scrapers and API clients
+HTTP_TOTAL_TIMEOUT = int(os.getenv("HTTP_TOTAL_TIMEOUT", 60))
+HTTP_CONNECT_TIMEOUT = int(os.getenv("HTTP_CONNECT_TIMEOUT", 10))
+HTTP_CONNECTION_LIMIT = int(os.getenv("HTTP_CONNECTION_LIMIT", 50))
+HTTP_CONNECTION_LIMIT_PER_HOST = int(os.getenv("HTTP_CONNECTION_LIMIT_PER_HOST", 6))
+HTTP_DNS_CACHE_TTL = int(os.getenv("HTTP_DNS_CACHE_TTL", 600))
+HTTP_KEEPALIVE_TIMEOUT = int(os.getenv("HTTP_KEEPALIVE_TIMEOUT", 60))
+
+# Number of new events from which ingest switches to asyncpg COPY
+EVENT_COPY_THRESHOLD = int(os.getenv("EVENT_COPY_THRESHOLD", 500))
+
+# Number of translations kept in the in-process translation memory
+TRANSLATION_MEMORY_SIZE = int(os.getenv("TRANSLATION_MEMORY_SIZE", 10000))
+
+# Maximum number of translation requests running at the same time, separately
+# for post generation and for ingest
+TRANSLATION_CONCURRENCY = int(os.getenv("TRANSLATION_CONCURRENCY", 4))
+
+# Timeout of a single translation request
+TRANSLATION_TIMEOUT = int(os.getenv("TRANSLATION_TIMEOUT", 10))
+
+# Key of the event digest; changing it makes every stored event look new
+EVENT_HASH_KEY = os.getenv("EVENT_HASH_KEY", "armenia-outages").encode("utf-8")
@@ -0,0 +1,68 @@
+import logging
+import aiohttp
+from config import (
+    HTTP_CONNECT_TIMEOUT,
+    HTTP_CONNECTION_LIMIT,
+    HTTP_CONNECTION_LIMIT_PER_HOST,
+    HTTP_DNS_CACHE_TTL,
+    HTTP_KEEPALIVE_TIMEOUT,
+    HTTP_TOTAL_TIMEOUT,
+)
+
+logger = logging.getLogger(__name__)
+
+_http_session = None
+
+
+def create_http_session():
+    """
+    Create a pooled aiohttp session with keep-alive, DNS caching, per-host
+    connection limits and compressed responses.
+    """
+    connector = aiohttp.TCPConnector(
+        limit=HTTP_CONNECTION_LIMIT,
+        limit_per_host=HTTP_CONNECTION_LIMIT_PER_HOST,
+        ttl_dns_cache=HTTP_DNS_CACHE_TTL,
+        keepalive_timeout=HTTP_KEEPALIVE_TIMEOUT,
+    )
+    timeout = aiohttp.ClientTimeout(
+        total=HTTP_TOTAL_TIMEOUT, connect=HTTP_CONNECT_TIMEOUT
+    )
+    return aiohttp.ClientSession(
+        connector=connector,
+        timeout=timeout,
+        auto_decompress=True,
+        headers={"Accept-Encoding": "gzip, deflate"},
+    )
+
+
+async def init_http_session():
+    """
+    Create the application-wide HTTP session. Called once from bot.main.
+    """
+    global _http_session
+    if _http_session is None or _http_session.closed:
+        _http_session = create_http_session()
+        logger.info("Shared HTTP session created")
+    return _http_session
+
+
+def get_http_session():
+    """
+    Return the shared HTTP session, creating it lazily for standalone runs.
+    """
+    global _http_session
+    if _http_session is None or _http_session.closed:
+        _http_session = create_http_session()
+    return _http_session
+
+
+async def close_http_session():
+    """
+    Close the shared HTTP session and release pooled connections.
+    """
+    global _http_session
+    if _http_session is not None and not _http_session.closed:
+        await _http_session.close()
+        logger.info("Shared HTTP session closed")
+    _http_session = None
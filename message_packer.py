@@ -0,0 +1,116 @@
+import re
+from typing import NamedTuple
+
+# Telegram limit of a message text, in UTF-16 code units after entity parsing
+TELEGRAM_MESSAGE_LIMIT = 4096
+
+# An escaped character or an unescaped MarkdownV2 entity marker
+MARKDOWN_V2_MARKUP_RE = re.compile(r"\\(.)|[*_~|`]", re.DOTALL)
+
+
+class Section(NamedTuple):
+    """
+    A block of post text that should stay in one message, with the events it covers.
+    """
+
+    text: str
+    event_ids: list
+
+
+class MessageChunk(NamedTuple):
+    """
+    The text of one channel message and the events it covers.
+    """
+
+    text: str
+    event_ids: list
+
+
+def telegram_length(text):
+    """
+    Returns the length Telegram counts for a MarkdownV2 text: UTF-16 code units of
+    the text left after entity parsing.
+    """
+    plain = MARKDOWN_V2_MARKUP_RE.sub(lambda match: match.group(1) or "", text)
+    return len(plain.encode("utf-16-le")) // 2
+
+
+def split_oversized(text, limit):
+    """
+    Splits a section text that does not fit in `limit` into pieces that do, at line
+    breaks, then spaces, and as a last resort anywhere outside an escape sequence.
+    """
+    pieces = []
+    while telegram_length(text) > limit:
+        cut = fitting_prefix_end(text, limit)
+        for separator in ("\n", " "):
+            position = text.rfind(separator, 0, cut)
+            if position > 0:
+                cut = position + 1
+                break
+        pieces.append(text[:cut])
+        text = text[cut:]
+    if text:
+        pieces.append(text)
+    return pieces
+
+
+def fitting_prefix_end(text, limit):
+    """
+    Returns the end of the longest prefix of `text` that fits in `limit`, without
+    separating an escape backslash from its character.
+    """
+    length = 0
+    end = 0
+    for match in re.finditer(r"\\.|.", text, re.DOTALL):
+        length += telegram_length(match.group())
+        if length > limit:
+            break
+        end = match.end()
+    return max(end, 1)
+
+
+def pack_sections(header, sections, limit=TELEGRAM_MESSAGE_LIMIT):
+    """
+    Packs sections into as few messages as possible, each starting with `header`.
+
+    Sections are placed first-fit in decreasing order of length, then every message
+    lists its sections in their original order and messages are ordered by their
+    first section. A section too long for a message of its own is split over
+    several messages, all of them covering its events.
+    """
+    capacity = limit - telegram_length(header)
+    if capacity <= 0:
+        raise ValueError("The message header alone exceeds the length limit.")
+
+    pieces = [
+        (piece, telegram_length(piece), section.event_ids)
+        for section in sections
+        for piece in split_oversized(section.text, capacity)
+    ]
+
+    bins = []
+    for index in sorted(range(len(pieces)), key=lambda i: -pieces[i][1]):
+        length = pieces[index][1]
+        for message in bins:
+            if message[0] >= length:
+                message[0] -= length
+                message[1].append(index)
+                break
+        else:
+            bins.append([capacity - length, [index]])
+
+    chunks = []
+    for remaining, indices in sorted(bins, key=lambda message: min(message[1])):
+        indices.sort()
+        event_ids = list(
+            dict.fromkeys(
+                event_id for index in indices for event_id in pieces[index][2]
+            )
+        )
+        chunks.append(
+            MessageChunk(
+                header + "".join(pieces[index][0] for index in indices), event_ids
+            )
+        )
+    return chunks
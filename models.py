@@ -1,17 +1,22 @@
 from datetime import datetime
 from sqlalchemy import (
+    ARRAY,
     BigInteger,
     Column,
     DateTime,
     ForeignKey,
+    ForeignKeyConstraint,
+    JSON,
     Index,
     Integer,
+    LargeBinary,
     String,
     Enum,
     Table,
     UniqueConstraint,
     Boolean,
     Text,
+    func,
 )
 from sqlalchemy.orm import relationship
 from db import Base
@@ -58,7 +63,15 @@ post_event_association = Table(
     "post_event_association",
     Base.metadata,
     Column("post_id", ForeignKey("posts.id", ondelete="CASCADE"), primary_key=True),
-    Column("event_id", ForeignKey("events.id", ondelete="CASCADE"), primary_key=True),
+    Column("event_id", Integer, primary_key=True),
+    # Partition key, copied from the event so both tables share partition bounds
+    Column("event_timestamp", DateTime, primary_key=True),
+    ForeignKeyConstraint(
+        ["event_id", "event_timestamp"],
+        ["events.id", "events.timestamp"],
+        ondelete="CASCADE",
+    ),
+    postgresql_partition_by="RANGE (event_timestamp)",
 )
 
 
@@ -74,6 +87,13 @@ class Area(Base):
 
     __table_args__ = (
         UniqueConstraint("name", "language", name="uq_area_name_language"),
+        # Serves the case-insensitive first-letter lookups of the subscription menu
+        Index(
+            "idx_areas_language_name_prefix",
+            "language",
+            func.lower(name).label("lower_name"),
+            postgresql_ops={"lower_name": "text_pattern_ops"},
+        ),
     )
 
 
@@ -95,32 +115,61 @@ class BotUser(Base):
 
 class Event(Base):
     __tablename__ = "events"
-    id = Column(Integer, primary_key=True)
+    id = Column(Integer, primary_key=True, autoincrement=True)
     event_type = Column(Enum(EventType))
     language = Column(Enum(Language))
 
     area = Column(String)
     district = Column(String)
     house_number = Column(String)
-    start_time = Column(String)
-    end_time = Column(String)
+    # Unique house numbers in natural order with their natural sort keys, split at
+    # ingest so posts can be grouped and ordered in SQL
+    house_numbers = Column(ARRAY(String))
+    house_number_keys = Column(ARRAY(String))
+    start_time = Column(DateTime(timezone=True))
+    end_time = Column(DateTime(timezone=True))
     text = Column(Text)
     planned = Column(Boolean)
 
     processed = Column(Boolean, default=False)
-    timestamp = Column(DateTime, default=datetime.now())
-    hash = Column(String, nullable=False)
+    resolved_time = Column(DateTime, nullable=True)
+    timestamp = Column(DateTime, primary_key=True, default=datetime.now)
+    digest = Column(LargeBinary(16), nullable=False)
 
     posts = relationship(
         "Post", secondary=post_event_association, back_populates="events"
     )
 
+    # Range-partitioned by day, see partitions.py. Unique indexes of a partitioned
+    # table must contain the partition key, so digests are claimed in the
+    # unpartitioned event_digests table before events are inserted.
     __table_args__ = (
-        UniqueConstraint("hash", name="_event_hash_uc"),
+        Index("idx_events_digest", "digest"),
         Index("idx_events_timestamp", "timestamp"),
+        Index("idx_events_start_time", "start_time"),
+        Index(
+            "idx_events_unprocessed",
+            "event_type",
+            "language",
+            "planned",
+            "id",
+            postgresql_where=processed.is_(False),
+        ),
+        {"postgresql_partition_by": "RANGE (timestamp)"},
     )
 
 
+class EventDigest(Base):
+    """
+    Digests of the stored events, the conflict arbiter of event inserts.
+    """
+
+    __tablename__ = "event_digests"
+
+    digest = Column(LargeBinary(16), primary_key=True)
+    created = Column(DateTime, nullable=False, default=datetime.now, index=True)
+
+
 class Subscription(Base):
     __tablename__ = "subscriptions"
 
@@ -148,6 +197,10 @@ class Post(Base):
     text = Column(String, nullable=False)
     creation_time = Column(DateTime, default=datetime.now)
     posted_time = Column(DateTime, nullable=True)
+    message_id = Column(BigInteger, nullable=True)
+    restored_time = Column(DateTime, nullable=True)
+    edited_time = Column(DateTime, nullable=True)
+    edit_attempts = Column(Integer, nullable=False, default=0, server_default="0")
     area_id = Column(Integer, ForeignKey("areas.id"), nullable=True)
 
     events = relationship(
@@ -158,6 +211,22 @@ class Post(Base):
     )
     area = relationship("Area", back_populates="posts")
 
+    # Queues polled by the sending tasks
+    __table_args__ = (
+        Index(
+            "idx_posts_unsent",
+            "post_type",
+            "creation_time",
+            postgresql_where=posted_time.is_(None),
+        ),
+        Index(
+            "idx_posts_restored_unedited",
+            "post_type",
+            "restored_time",
+            postgresql_where=restored_time.isnot(None) & edited_time.is_(None),
+        ),
+    )
+
 
 class Notification(Base):
     __tablename__ = "notifications"
@@ -171,3 +240,44 @@ class Notification(Base):
     sent_time = Column(DateTime, nullable=True)
 
     subscription = relationship("Subscription", back_populates="notifications")
+
+
+class SourceState(Base):
+    __tablename__ = "source_states"
+
+    id = Column(Integer, primary_key=True)
+    source = Column(Enum(EventType), nullable=False)
+    language = Column(Enum(Language), nullable=False)
+    etag = Column(String, nullable=True)
+    last_modified = Column(String, nullable=True)
+    digest = Column(String, nullable=True)
+    snapshot = Column(JSON, nullable=True)
+    watermark = Column(JSON, nullable=True)
+    updated_time = Column(DateTime, default=datetime.now)
+
+    __table_args__ = (
+        UniqueConstraint("source", "language", name="uq_source_state_source_language"),
+    )
+
+
+class TranslationMemoryEntry(Base):
+    __tablename__ = "translation_memory"
+
+    id = Column(Integer, primary_key=True)
+    source_text = Column(Text, nullable=False)
+    # Fixed-size key of the normalized source text, long texts do not fit in a
+    # btree index entry
+    source_digest = Column(LargeBinary(16), nullable=False)
+    source_language = Column(String, nullable=False)
+    target_language = Column(String, nullable=False)
+    translation = Column(Text, nullable=False)
+    created = Column(DateTime, default=datetime.now)
+
+    __table_args__ = (
+        UniqueConstraint(
+            "source_digest",
+            "source_language",
+            "target_language",
+            name="uq_translation_memory_source_target",
+        ),
+    )
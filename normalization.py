@@ -0,0 +1,93 @@
+from enum import Enum
+from functools import lru_cache
+import re
+import unicodedata
+from models import Language
+
+NORMALIZATION_CACHE_SIZE = 65536
+
+# Corrections of common transliteration mistakes, applied after normalization
+CORRECTIONS = {
+    "ШАРК": "РЯД",
+    "SHARQ": "ROW",
+    "МИКРОШРДЖАН": "МИКРОРАЙОН",
+    "MIKROSHRDJAN": "MICRODISTRICT",
+}
+# One alternation over all corrections, longest first, replacing them in a single scan
+CORRECTIONS_RE = re.compile(
+    "|".join(re.escape(wrong) for wrong in sorted(CORRECTIONS, key=len, reverse=True))
+)
+
+ARMENIAN_CHARS_RE = re.compile("[Ա-Ֆա-ֆ]")
+CYRILLIC_CHARS_RE = re.compile("[А-яЁё]")
+LATIN_CHARS_RE = re.compile("[A-Za-z]")
+
+MARKDOWN_V2_SPECIAL_CHARACTERS = "_*[]()~`>#+-=|{}.!"
+# Dash variants become a regular hyphen and non-breaking spaces a regular space
+# before escaping. str.replace scans in C, so on post-sized texts a presence check
+# plus replace per character beats a str.translate table with multi-char values.
+MARKDOWN_V2_REPLACEMENTS = (
+    ("—", "-"),
+    ("–", "-"),
+    ("−", "-"),
+    ("\u00A0", " "),
+    *((char, f"\\{char}") for char in MARKDOWN_V2_SPECIAL_CHARACTERS),
+)
+
+
+@lru_cache(maxsize=NORMALIZATION_CACHE_SIZE)
+def _normalize_string(value):
+    value = unicodedata.normalize("NFC", value.strip().upper())
+    return " ".join(value.split())
+
+
+def normalize_text(value):
+    """
+    Normalize the input value by applying Unicode normalization and
+    converting to uppercase.
+
+    Handles different input types (strings, enums) and removes extra spaces.
+    """
+    if value is None:
+        return ""
+    if isinstance(value, Enum):
+        return _normalize_string(value.name)
+    return _normalize_string(str(value))
+
+
+@lru_cache(maxsize=NORMALIZATION_CACHE_SIZE)
+def _apply_corrections(value):
+    return CORRECTIONS_RE.sub(lambda match: CORRECTIONS[match.group(0)], value)
+
+
+def normalize_value(value):
+    """
+    Normalize the input value and apply corrections for common mistakes.
+    """
+    return _apply_corrections(normalize_text(value))
+
+
+@lru_cache(maxsize=NORMALIZATION_CACHE_SIZE)
+def detect_language_by_charset(text):
+    """
+    Detects language by checking the character set of the text.
+    Returns Language.HY, Language.RU or Language.EN, or None if undetermined.
+    """
+    if ARMENIAN_CHARS_RE.search(text):
+        return Language.HY
+    if CYRILLIC_CHARS_RE.search(text):
+        return Language.RU
+    if LATIN_CHARS_RE.search(text):
+        return Language.EN
+    return None
+
+
+def escape_markdown_v2(text):
+    """
+    Replaces all dash variants with a regular hyphen and escapes special characters
+    in the text for correct rendering in MarkdownV2.
+    """
+    for char, replacement in MARKDOWN_V2_REPLACEMENTS:
+        if char in text:
+            text = text.replace(char, replacement)
+    return text
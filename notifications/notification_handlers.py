@@ -6,6 +6,22 @@ from sqlalchemy.future import select
 logger = logging.getLogger(__name__)
 
 
+def matches_keyword(event, keyword):
+    """
+    Checks whether a subscription keyword occurs in an event. Districts of power
+    events and streets of water events are extracted at ingest, the full text of
+    other events is searched as well, since the extraction drops their locality.
+    """
+    keyword = keyword.lower()
+    if event.district and keyword in event.district.lower():
+        return True
+    return (
+        event.event_type != EventType.POWER
+        and bool(event.text)
+        and keyword in event.text.lower()
+    )
+
+
 async def create_notifications_for_subscribers(session) -> None:
     logger.info("Generating notifications for subscribers...")
 
@@ -22,16 +38,7 @@ async def create_notifications_for_subscribers(session) -> None:
             events = [
                 event
                 for event in events
-                if (
-                    event.event_type == EventType.POWER
-                    and event.district
-                    and subscription.keyword.lower() in event.district.lower()
-                )
-                or (
-                    event.event_type != EventType.POWER
-                    and event.text
-                    and subscription.keyword.lower() in event.text.lower()
-                )
+                if matches_keyword(event, subscription.keyword)
             ]
 
         for event in events:
@@ -1,31 +1,238 @@
 from datetime import datetime
+from enum import Enum as PyEnum
 import logging
+from typing import NamedTuple, Optional
 
+from sqlalchemy import text, update
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.future import select
+from area_registry import AreaRecord, area_registry
+from config import EVENT_COPY_THRESHOLD
 from db import session_scope
-from models import Area, BotUser, Event, Language, Post
+from models import (
+    BotUser,
+    Event,
+    EventDigest,
+    Language,
+    Post,
+    PostType,
+    SourceState,
+    post_event_association,
+)
 
 logger = logging.getLogger(__name__)
 
 
-async def save_post_to_db(session, post_type, text, event_ids, language, area):
-    """Save a generated post to the database with multiple event_ids asynchronously."""
-    events = await session.execute(select(Event).filter(Event.id.in_(event_ids)))
-    events = events.scalars().all()
+class PendingPost(NamedTuple):
+    """
+    A generated post waiting to be written by `save_posts_to_db`.
+    """
+
+    post_type: PostType
+    text: str
+    event_ids: list
+    language: Language
+    area: Optional[AreaRecord]
+
+
+async def save_posts_to_db(session, pending_posts):
+    """
+    Writes many generated posts and their event links in bulk without committing.
+
+    Posts go in with a batched INSERT ... RETURNING, the partition keys of the linked
+    events are read with one query and the association rows are written with one
+    more batched INSERT. Returns the ids of the new posts in the order of `pending_posts`.
+    """
+    if not pending_posts:
+        return []
+
+    now = datetime.now()
+    result = await session.execute(
+        insert(Post).returning(Post.id, sort_by_parameter_order=True),
+        [
+            {
+                "language": pending.language,
+                "post_type": pending.post_type,
+                "area_id": pending.area.id if pending.area else None,
+                "text": pending.text,
+                "creation_time": now,
+                "posted_time": None,
+            }
+            for pending in pending_posts
+        ],
+    )
+    post_ids = result.scalars().all()
+
+    event_ids = {
+        event_id for pending in pending_posts for event_id in pending.event_ids
+    }
+    if event_ids:
+        result = await session.execute(
+            select(Event.id, Event.timestamp).filter(Event.id.in_(event_ids))
+        )
+        event_timestamps = dict(result.all())
+
+        links = {
+            (post_id, event_id): event_timestamps[event_id]
+            for post_id, pending in zip(post_ids, pending_posts)
+            for event_id in pending.event_ids
+            if event_id in event_timestamps
+        }
+        if links:
+            await session.execute(
+                insert(post_event_association),
+                [
+                    {
+                        "post_id": post_id,
+                        "event_id": event_id,
+                        "event_timestamp": event_timestamp,
+                    }
+                    for (post_id, event_id), event_timestamp in links.items()
+                ],
+            )
+
+    logger.debug(f"Saved {len(post_ids)} posts to the database.")
+    return post_ids
+
+
+EVENT_INSERT_COLUMNS = [
+    "event_type",
+    "language",
+    "area",
+    "district",
+    "house_number",
+    "house_numbers",
+    "house_number_keys",
+    "start_time",
+    "end_time",
+    "text",
+    "planned",
+    "processed",
+    "timestamp",
+    "digest",
+]
+
+
+async def filter_new_event_digests(session, digests):
+    """
+    Returns the subset of `digests` that is not stored yet, using a single query.
+    """
+    digests = set(digests)
+    if not digests:
+        return set()
+
+    result = await session.execute(
+        select(EventDigest.digest).filter(EventDigest.digest.in_(digests))
+    )
+    return digests - set(result.scalars().all())
+
+
+async def claim_event_digests(session, digests):
+    """
+    Records the given digests, returning the ones that were not recorded yet. A
+    digest being claimed by a concurrent transaction is returned only if that
+    transaction rolls back.
+    """
+    if not digests:
+        return set()
+
+    result = await session.execute(
+        insert(EventDigest)
+        .values([{"digest": digest} for digest in digests])
+        .on_conflict_do_nothing()
+        .returning(EventDigest.digest)
+    )
+    return set(result.scalars().all())
+
+
+async def bulk_insert_events(session, events):
+    """
+    Inserts event rows (dicts keyed by Event columns) skipping known digests.
+
+    The events table is partitioned, so digests cannot have a unique index there.
+    New digests are claimed with ON CONFLICT DO NOTHING in the unpartitioned
+    event_digests table instead, after a read-only pre-filter of the known ones, and
+    only the events of claimed digests are inserted. Large batches go through
+    asyncpg COPY into a staging table. Returns the ids of the inserted rows.
+    """
+    unique_events = {}
+    for event in events:
+        unique_events.setdefault(event["digest"], event)
+
+    new_digests = await filter_new_event_digests(session, unique_events.keys())
+    claimed_digests = await claim_event_digests(session, sorted(new_digests))
+    rows = [
+        {
+            **dict.fromkeys(EVENT_INSERT_COLUMNS),
+            "processed": False,
+            "timestamp": datetime.now(),
+            **event,
+        }
+        for digest, event in unique_events.items()
+        if digest in claimed_digests
+    ]
+    if not rows:
+        return []
+
+    if len(rows) >= EVENT_COPY_THRESHOLD:
+        return await copy_insert_events(session, rows)
+
+    result = await session.execute(insert(Event).values(rows).returning(Event.id))
+    return result.scalars().all()
+
+
+async def copy_insert_events(session, rows):
+    """
+    Bulk loads event rows with asyncpg COPY into a temporary staging table and moves
+    them into `events` with a single INSERT ... SELECT.
+    """
+    columns = ", ".join(EVENT_INSERT_COLUMNS)
+    connection = await session.connection()
+
+    await connection.execute(
+        text(
+            f"CREATE TEMP TABLE IF NOT EXISTS events_staging ON COMMIT DROP "
+            f"AS SELECT {columns} FROM events WITH NO DATA"
+        )
+    )
+    await connection.execute(text("TRUNCATE events_staging"))
+
+    raw_connection = await connection.get_raw_connection()
+    await raw_connection.driver_connection.copy_records_to_table(
+        "events_staging",
+        records=[
+            tuple(
+                row[column].name if isinstance(row[column], PyEnum) else row[column]
+                for column in EVENT_INSERT_COLUMNS
+            )
+            for row in rows
+        ],
+        columns=EVENT_INSERT_COLUMNS,
+    )
 
-    post = Post(
-        language=language,
-        post_type=post_type,
-        area=area,
-        text=text,
-        creation_time=datetime.now(),
-        posted_time=None,
-        events=events,
+    result = await connection.execute(
+        text(
+            f"INSERT INTO events ({columns}) SELECT {columns} FROM events_staging "
+            f"RETURNING id"
+        )
     )
+    return result.scalars().all()
+
+
+async def mark_events_resolved(session, digests):
+    """
+    Marks the events with the given digests as resolved. Returns the number of events updated.
+    """
+    if not digests:
+        return 0
 
-    session.add(post)
-    await session.commit()
-    logger.debug(f"Post saved to the database: {text[:60]}...")
+    result = await session.execute(
+        update(Event)
+        .where(Event.digest.in_(set(digests)), Event.resolved_time.is_(None))
+        .values(resolved_time=datetime.now())
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount
 
 
 async def clean_area_name(raw_name):
@@ -66,9 +273,13 @@ async def clean_area_name(raw_name):
     return cleaned_name.capitalize() if cleaned_name else ""
 
 
-async def get_or_create_area(session, area_name: str, language: Language) -> Area:
+async def get_or_create_area(
+    session, area_name: str, language: Language
+) -> Optional[AreaRecord]:
     """
     Retrieves an existing Area by name and language, or creates it if it doesn't exist.
+    Lookups are served by the process-wide area registry, new areas are written in
+    the caller's transaction and committed with it.
     """
     # Clean the area name
     area_name = await clean_area_name(area_name)
@@ -78,19 +289,23 @@ async def get_or_create_area(session, area_name: str, language: Language) -> Are
         logger.warning("Area name is empty after cleaning. Skipping area creation.")
         return None
 
-    # Check if the area already exists
+    return await area_registry.get_or_create(session, area_name, language)
+
+
+async def get_or_create_source_state(session, source, language) -> SourceState:
+    """
+    Retrieves the fetch state of an outage source for a language, creating an empty one if needed.
+    """
     result = await session.execute(
-        select(Area).filter_by(name=area_name, language=language)
+        select(SourceState).filter_by(source=source, language=language)
     )
-    area = result.scalars().first()
+    state = result.scalars().first()
 
-    # If the area doesn't exist, create it
-    if not area:
-        area = Area(name=area_name, language=language)
-        session.add(area)
-        await session.commit()
+    if not state:
+        state = SourceState(source=source, language=language)
+        session.add(state)
 
-    return area
+    return state
 
 
 async def get_or_create_user(
@@ -0,0 +1,93 @@
+from collections import Counter
+from datetime import datetime
+import hashlib
+import logging
+from http_client import get_http_session
+from orm import get_or_create_source_state
+
+logger = logging.getLogger(__name__)
+
+# Counters of fetch outcomes per source, e.g. fetch_metrics["POWER.not_modified"]
+fetch_metrics = Counter()
+
+
+class FetchResult:
+    """
+    Outcome of a conditional fetch. `html` is None when the page is unchanged or unavailable.
+    """
+
+    def __init__(self, state, html=None, etag=None, last_modified=None, digest=None):
+        self.state = state
+        self.html = html
+        self.etag = etag
+        self.last_modified = last_modified
+        self.digest = digest
+
+    @property
+    def changed(self):
+        return self.html is not None
+
+    def commit_state(self):
+        """
+        Store validators of a successfully processed page so the next poll can skip it.
+        Call inside the same session that saves the parsed events.
+        """
+        self.state.etag = self.etag
+        self.state.last_modified = self.last_modified
+        self.state.digest = self.digest
+        self.state.updated_time = datetime.now()
+
+
+def compute_body_digest(html):
+    return hashlib.sha256(html.encode("utf-8")).hexdigest()
+
+
+def _record(source, outcome):
+    fetch_metrics[f"{source.name}.{outcome}"] += 1
+
+
+async def fetch_if_changed(db_session, source, language, url):
+    """
+    Fetch `url` with conditional request headers taken from the last stored state of
+    the source and language. Falls back to a body digest comparison when the server
+    does not support ETag / Last-Modified.
+    """
+    state = await get_or_create_source_state(db_session, source, language)
+
+    headers = {}
+    if state.etag:
+        headers["If-None-Match"] = state.etag
+    if state.last_modified:
+        headers["If-Modified-Since"] = state.last_modified
+
+    async with get_http_session().get(url, headers=headers) as response:
+        if response.status == 304:
+            _record(source, "not_modified")
+            logger.info(
+                f"{source.name} page for {language.name} not modified (HTTP 304). Skipping..."
+            )
+            return FetchResult(state)
+
+        if response.status != 200:
+            _record(source, "failed")
+            logger.error(f"Failed to retrieve data from {url}: {response.status}")
+            return FetchResult(state)
+
+        html = await response.text()
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+
+    digest = compute_body_digest(html)
+    if digest == state.digest:
+        state.etag = etag
+        state.last_modified = last_modified
+        _record(source, "unchanged")
+        logger.info(
+            f"{source.name} page for {language.name} unchanged (same digest). Skipping..."
+        )
+        return FetchResult(state)
+
+    _record(source, "changed")
+    return FetchResult(
+        state, html=html, etag=etag, last_modified=last_modified, digest=digest
+    )
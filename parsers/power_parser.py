@@ -1,205 +1,289 @@
-import aiohttp
 import asyncio
 import logging
 from datetime import datetime, timedelta
-from bs4 import BeautifulSoup
-from models import Event, EventType, Language
-from config import POWER_OUTAGE_URL
+import lxml.html
+from models import EventType, Language
+from config import POWER_EVENT_WINDOW_HOURS, POWER_OUTAGE_URL, POWER_PARSE_TIMEOUT
+from db import session_scope
+from http_client import close_http_session
+from orm import bulk_insert_events, mark_events_resolved
+from parsers.fetcher import fetch_if_changed
+from parsers.snapshots import diff_rows, snapshot_store
 import re
-from utils import compute_hash, normalize_and_translate_value
-from sqlalchemy.future import select
+from typing import NamedTuple, Optional
+from utils import (
+    compute_hash,
+    local_now,
+    normalize_value,
+    parse_outage_time,
+    split_house_numbers,
+    translate_values,
+)
 
 logger = logging.getLogger(__name__)
 
+OUTAGE_TABLE_ID = "ctl00_ContentPlaceHolder1_vtarayin"
+
+
+class OutageRow(NamedTuple):
+    """
+    A raw row of the ENA outage table.
+    """
+
+    start_time: str
+    address: str
+
+
+class Address(NamedTuple):
+    area: str
+    district: Optional[str]
+    house_numbers: Optional[str]
+
+
+# A house number token: digits, letters, slashes, dashes, dots and commas with at least one digit
+HOUSE_NUMBER_RE = re.compile(r"[\dA-ZА-Яа-ֆ/\\\-.,]*\d[\dA-ZА-Яа-ֆ/\\\-.,]*")
+# A number followed by a single Armenian building letter, e.g. "7 Բ"
+NUMBER_LETTER_RE = re.compile(r"\d+ [Ա-Ֆա-ֆ]")
+
 
 def split_address(address):
-    parts = address.split(",")
-    if len(parts) == 1:
-        return parts[0].strip(), None, None  # Only area, no district or house number
-
-    # Separate area and right part after the first comma
-    area = parts[0].strip()
-    right_part = ",".join(parts[1:]).strip()  # Join the rest in case of multiple commas
-
-    # Regular expression to check for valid house number patterns
-    house_number_pattern = r"^[\dA-ZА-Яа-ֆ/\\\-.,]*\d+[\dA-ZА-Яа-ֆ/\\\-.,]*$"
-    number_letter_pattern = r"^\d+ [Ա-Ֆա-ֆ]$"
-
-    # Additional check if the right part could be a house number with space and single letter
-    if re.match(number_letter_pattern, right_part):
-        return area, None, right_part  # Only area and house number, no district
-
-    # Check if the entire right part could be a house number
-    if re.match(house_number_pattern, right_part) and not (
-        " " in right_part and not re.match(number_letter_pattern, right_part)
-    ):
-        return area, None, right_part  # Only area and house number, no district
-
-    # If the entire right part is not a house number, try to split by the last space
-    last_space_index = right_part.rfind(" ")
-
-    if last_space_index != -1:
-        # Check potential house number after the last space
-        potential_house_number = right_part[last_space_index + 1 :].strip()
-        district = right_part[:last_space_index].strip()
-
-        # Check if potential house number is a valid house number
-        if re.match(house_number_pattern, potential_house_number):
-            # Additional check for cases with number and single Armenian letter
-            if " " in potential_house_number and not re.match(
-                number_letter_pattern, potential_house_number
-            ):
-                # Continue checking for the case where there might be another space within the district
-                pass
-            else:
-                return area, district, potential_house_number
-
-        # Check for the presence of a second-to-last space
-        second_last_space_index = right_part[:last_space_index].rfind(" ")
-        if second_last_space_index != -1:
-            potential_house_number = right_part[second_last_space_index + 1 :].strip()
-            district = right_part[:second_last_space_index].strip()
-            if re.match(number_letter_pattern, potential_house_number):
-                return area, district, potential_house_number
-            else:
-                return area, right_part, None
-        else:
-            # If there is no second last space, treat the whole right part as district
-            return area, right_part, None
-    else:
-        # No spaces in the right part; consider it entirely as district
-        return area, right_part, None
-
-
-def filter_by_date(event_date_str):
-    try:
-        event_date = datetime.strptime(event_date_str, "%d.%m.%Y %H:%M")
-        current_date = datetime.now()
-        return current_date - event_date <= timedelta(days=1)
-    except ValueError:
-        return False
+    """
+    Splits an ENA address into area, district and house numbers in a single pass.
+
+    The area is everything before the first comma. In the rest, the house numbers
+    are the whole remainder, its last token, or a trailing "number letter" pair,
+    in that order of preference; whatever precedes them is the district.
+    """
+    area, comma, right_part = address.partition(",")
+    area = area.strip()
+    if not comma:
+        return Address(area, None, None)  # Only area, no district or house number
+
+    right_part = right_part.strip()
+    if NUMBER_LETTER_RE.fullmatch(right_part) or HOUSE_NUMBER_RE.fullmatch(right_part):
+        return Address(area, None, right_part)  # Only area and house number
+
+    head, space, last_token = right_part.rpartition(" ")
+    if not space:
+        # No spaces, the whole part is a district
+        return Address(area, right_part, None)
+
+    last_token = last_token.strip()
+    if HOUSE_NUMBER_RE.fullmatch(last_token):
+        return Address(area, head.strip(), last_token)
+
+    district, space, _ = head.rpartition(" ")
+    if space:
+        house_numbers = right_part[len(district) + 1 :].strip()
+        if NUMBER_LETTER_RE.fullmatch(house_numbers):
+            return Address(area, district.strip(), house_numbers)
 
+    return Address(area, right_part, None)
 
-async def fetch_page(url):
+
+def filter_by_date(start_time):
     """
-    Fetch the page content with JavaScript disabled.
+    Checks whether an outage that started at `start_time` is still relevant.
     """
-    async with aiohttp.ClientSession() as session:
-        async with session.get(url) as response:
-            if response.status != 200:
-                logger.error(f"Failed to retrieve data from {url}: {response.status}")
-                return None
+    if start_time is None:
+        return False
+    return local_now() - start_time <= timedelta(hours=POWER_EVENT_WINDOW_HOURS)
 
-            html = await response.text()
-            return html
 
+async def build_power_events(raw_rows, language, filter_dates=True):
+    """
+    Turns raw table rows into event dicts: splits the address, normalizes and
+    translates the fields and computes the event digest. The digest is computed
+    over the published time string, the stored start time is timezone-aware. House
+    numbers are also stored split, deduplicated and with their natural sort keys.
+    """
+    rows = []
+    for row in map(OutageRow._make, raw_rows):
+        area, district, house_numbers = split_address(row.address)
+        start_time = normalize_value(row.start_time)
+        outage_time = parse_outage_time(start_time)
+
+        if filter_dates and not filter_by_date(outage_time):
+            continue
+
+        rows.append(
+            (
+                start_time,
+                outage_time,
+                normalize_value(area),
+                normalize_value(district),
+                normalize_value(house_numbers),
+            )
+        )
+
+    translations = await translate_values(
+        [value for row in rows for value in row[2:]], language.text
+    )
+
+    events = []
+    for start_time, outage_time, area, district, house_numbers in rows:
+        area = translations.get(area, area)
+        district = translations.get(district, district)
+        house_numbers = translations.get(house_numbers, house_numbers)
+
+        digest = compute_hash(
+            EventType.POWER,
+            area,
+            district,
+            house_numbers,
+            start_time,
+            language,
+            False,
+        )
+        numbers, number_keys = split_house_numbers(house_numbers)
+
+        events.append(
+            {
+                "event_type": EventType.POWER,
+                "area": area,
+                "district": district,
+                "house_number": house_numbers,
+                "house_numbers": numbers,
+                "house_number_keys": number_keys,
+                "start_time": outage_time,
+                "end_time": None,
+                "language": language,
+                "planned": False,
+                "digest": digest,
+                "timestamp": datetime.now(),
+            }
+        )
+
+    return events
+
+
+async def parse_emergency_power_events_for_language(language):
+    """
+    Fetch, parse and store power outages for a single language in its own session.
 
-async def parse_emergency_power_events(db_session):
+    Only rows that were not in the previous snapshot of the table go through
+    normalization, translation and hashing. Events of rows that disappeared from
+    the table are marked resolved. Returns the row diff, or None when the page did
+    not change. When translations are unavailable nothing is stored, so the page is
+    processed again on the next run.
     """
-    Asynchronously parse power outages data for all supported languages.
+    logger.info(f"Parsing emergency power updates for language: {language.name}")
+
+    async with session_scope() as db_session:
+        fetch_result = await fetch_if_changed(
+            db_session,
+            EventType.POWER,
+            language,
+            POWER_OUTAGE_URL.format(lang=language.code),
+        )
+        if not fetch_result.changed:
+            return None
+
+        data = extract_table_rows(fetch_result.html)
+        diff = diff_rows(snapshot_store.get(fetch_result.state), data)
+        logger.info(
+            f"Table diff for {language.name}: {len(diff.added)} added, "
+            f"{len(diff.removed)} removed, {diff.unchanged} unchanged rows."
+        )
+
+        new_events = await build_power_events(diff.added, language)
+        removed_events = await build_power_events(
+            diff.removed, language, filter_dates=False
+        )
+
+        new_event_ids = await bulk_insert_events(db_session, new_events)
+        resolved_count = await mark_events_resolved(
+            db_session, [event["digest"] for event in removed_events]
+        )
+
+        fetch_result.commit_state()
+        snapshot_store.stage(fetch_result.state, data)
+
+    snapshot_store.remember(fetch_result.state, data)
+
+    logger.info(
+        f"Added {len(new_event_ids)} new records and resolved {resolved_count} "
+        f"events in the database for language {language.name}."
+    )
+    return diff
+
+
+async def parse_emergency_power_events():
     """
-    for language in Language:
-        logger.info(f"Parsing emergency power updates for language: {language.name}")
+    Asynchronously parse power outages data for all supported languages.
 
-        try:
-            html = await fetch_page(POWER_OUTAGE_URL.format(lang=language.code))
-            if not html:
-                logger.error(
-                    f"No HTML content returned for {language.name}. Skipping..."
-                )
-                continue
-
-            soup = BeautifulSoup(html, "html.parser")
-            data = await parse_table(soup)
-
-            new_records_count = 0
-
-            for event in data:
-                area, district, house_numbers = split_address(event[1])
-                start_time = normalize_and_translate_value(event[0])
-                area = normalize_and_translate_value(area, language.text)
-                district = normalize_and_translate_value(district, language.text)
-                house_numbers = normalize_and_translate_value(
-                    house_numbers, language.text
-                )
-
-                if not filter_by_date(start_time):
-                    continue
-
-                event_hash = compute_hash(
-                    EventType.POWER,
-                    area,
-                    district,
-                    house_numbers,
-                    start_time,
-                    language,
-                    False,
-                )
-
-                result = await db_session.execute(
-                    select(Event).filter_by(hash=event_hash)
-                )
-                existing_event = result.scalars().first()
-
-                if existing_event:
-                    continue
-
-                new_event = Event(
-                    event_type=EventType.POWER,
-                    area=area,
-                    district=district,
-                    house_number=house_numbers,
-                    start_time=start_time,
-                    end_time=None,
-                    language=language,
-                    planned=False,
-                    hash=event_hash,
-                    timestamp=datetime.now(),
-                )
-                db_session.add(new_event)
-                new_records_count += 1
-
-            await db_session.commit()
-
-            logger.info(
-                f"Added {new_records_count} new records to the database for language {language.name}."
+    Every language is fetched and stored concurrently in its own session, with its
+    own timeout, so a slow or failing page does not delay or roll back the others.
+    """
+    languages = list(Language)
+    results = await asyncio.gather(
+        *(
+            asyncio.wait_for(
+                parse_emergency_power_events_for_language(language),
+                timeout=POWER_PARSE_TIMEOUT,
             )
+            for language in languages
+        ),
+        return_exceptions=True,
+    )
+
+    for language, result in zip(languages, results):
+        if isinstance(result, asyncio.TimeoutError):
+            logger.error(
+                f"Parsing for language {language.name} timed out after {POWER_PARSE_TIMEOUT} seconds."
+            )
+        elif isinstance(result, Exception):
+            logger.error(f"Error during parsing for language {language.name}: {result}")
 
-        except Exception as e:
-            logger.error(f"Error during parsing: {e}")
+    return results
 
 
-async def parse_table(soup):
+def extract_table_rows(html):
     """
-    Parses the table from the provided BeautifulSoup object.
+    Extracts the outage table rows from the raw page HTML using lxml.
+
+    Only the outage table is walked, and each row is returned as an `OutageRow`
+    of stripped cell texts. Rows with fewer cells are skipped.
     """
+    if not html or not html.strip():
+        logger.error("The outage page is empty.")
+        return []
+
     try:
-        table = soup.find("table", {"id": "ctl00_ContentPlaceHolder1_vtarayin"})
-        if table is None:
-            logger.error("Could not find the table on the page.")
-            return []
+        document = lxml.html.fromstring(html)
+    except ValueError:
+        # lxml refuses str input with an XML encoding declaration
+        document = lxml.html.fromstring(html.encode("utf-8"))
 
-        rows = table.find("tbody").find_all("tr")
-        data = []
+    tables = document.xpath("//table[@id=$table_id]", table_id=OUTAGE_TABLE_ID)
+    if not tables:
+        logger.error("Could not find the table on the page.")
+        return []
 
-        for row in rows:
-            cols = row.find_all("td")
-            cols = [ele.text.strip() for ele in cols]
-            data.append(cols)
+    tbody = tables[0].find(".//tbody")
+    if tbody is None:
+        logger.error("Could not find the table body on the page.")
+        return []
 
-        logger.info(f"Parsed {len(data)} rows from the table.")
+    data = []
+    for row in tbody.iter("tr"):
+        cells = [cell.text_content().strip() for cell in row.iter("td")]
+        if len(cells) < len(OutageRow._fields):
+            logger.warning(f"Skipped a malformed table row: {cells}")
+            continue
+        data.append(OutageRow._make(cells[: len(OutageRow._fields)]))
 
-        return data
-    except Exception as e:
-        logger.error(f"Error while parsing the table: {e}")
-        return []
+    logger.info(f"Parsed {len(data)} rows from the table.")
+
+    return data
 
 
 if __name__ == "__main__":
-    from db import session_scope
 
     async def main():
-        async with session_scope() as db_session:
-            await parse_emergency_power_events(db_session)
+        try:
+            await parse_emergency_power_events()
+        finally:
+            await close_http_session()
 
     asyncio.run(main())
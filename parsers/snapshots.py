@@ -0,0 +1,65 @@
+import logging
+from typing import NamedTuple
+
+logger = logging.getLogger(__name__)
+
+
+class RowDiff(NamedTuple):
+    """
+    Difference between two snapshots of raw table rows.
+    """
+
+    added: list
+    removed: list
+    unchanged: int
+
+
+def diff_rows(previous, current):
+    """
+    Compares raw row tuples of the previous and current snapshot, keeping page order.
+    Without a previous snapshot every current row counts as added.
+    """
+    current = [tuple(row) for row in current]
+    if previous is None:
+        return RowDiff(added=current, removed=[], unchanged=0)
+
+    previous_set = set(previous)
+    current_set = set(current)
+    added = [row for row in current if row not in previous_set]
+    removed = [row for row in previous if row not in current_set]
+    return RowDiff(added=added, removed=removed, unchanged=len(current) - len(added))
+
+
+class SnapshotStore:
+    """
+    Keeps the last snapshot of raw rows per source state in memory, persisted in
+    `SourceState.snapshot` so that a restart does not reprocess the whole table.
+    """
+
+    def __init__(self):
+        self._snapshots = {}
+
+    @staticmethod
+    def _key(state):
+        return (state.source, state.language)
+
+    def get(self, state):
+        key = self._key(state)
+        if key not in self._snapshots and state.snapshot is not None:
+            self._snapshots[key] = [tuple(row) for row in state.snapshot]
+        return self._snapshots.get(key)
+
+    def stage(self, state, rows):
+        """
+        Writes the snapshot to the state row; it is persisted with the session commit.
+        """
+        state.snapshot = [list(row) for row in rows]
+
+    def remember(self, state, rows):
+        """
+        Replaces the in-memory snapshot. Call only after the session was committed.
+        """
+        self._snapshots[self._key(state)] = [tuple(row) for row in rows]
+
+
+snapshot_store = SnapshotStore()
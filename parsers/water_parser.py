@@ -1,120 +1,287 @@
 import asyncio
-from datetime import datetime
+from datetime import date, datetime, time, timedelta
+import hashlib
 import logging
 import re
+from typing import NamedTuple, Optional
 from bs4 import BeautifulSoup
-import aiohttp
+from area_matcher import area_matcher
 from db import session_scope
-from utils import compute_hash_by_text
-from models import Event, EventType, Language
-from config import WATER_OUTAGE_URL
-from sqlalchemy.future import select
-
+from http_client import close_http_session
+from orm import bulk_insert_events, filter_new_event_digests
+from parsers.fetcher import fetch_if_changed
+from utils import LOCAL_TIMEZONE, compute_hash_by_text, local_now
+from models import EventType, Language
+from config import EVENT_RETENTION_DAYS, WATER_OUTAGE_URL
 
 logger = logging.getLogger(__name__)
 
 
-def filter_by_date(text):
+ARMENIAN_MONTHS = {
+    "հունվարի": 1,
+    "փետրվարի": 2,
+    "մարտի": 3,
+    "ապրիլի": 4,
+    "մայիսի": 5,
+    "հունիսի": 6,
+    "հուլիսի": 7,
+    "օգոստոսի": 8,
+    "սեպտեմբերի": 9,
+    "հոկտեմբերի": 10,
+    "նոյեմբերի": 11,
+    "դեկտեմբերի": 12,
+}
+# Outage date, e.g. "օգոստոսի 31-ին"
+OUTAGE_DATE_RE = re.compile(rf"({'|'.join(ARMENIAN_MONTHS)}) (\d{{1,2}})")
+# Outage time window, e.g. "13:00-17:00"
+OUTAGE_TIME_RE = re.compile(r"(\d{1,2}):(\d{2})\s*[-–]\s*(\d{1,2}):(\d{2})")
+# Publication date at the end of the announcement, e.g. "30.08.2024թ."
+PUBLICATION_DATE_RE = re.compile(r"(\d{2}\.\d{2}\.\d{4})թ?\.$")
+# The list of places between "will be stopped" and "water supply"
+STREETS_SECTION_RE = re.compile(r"կդադարեցվի\s+(.+?)\s+ջրամատակարարումը", re.S)
+# Settlement or district the street list starts with, e.g. "Աբովյան քաղաքի"
+LOCALITY_PREFIX_RE = re.compile(
+    r"^.*(?:քաղաքի|գյուղի|համայնքի|թաղամասի|վարչական շրջանի)\s+", re.S
+)
+# Street separators; commas inside house number lists like "3,4,5" are kept
+STREET_SEPARATOR_RE = re.compile(r",\s+(?=\D)|\s+և\s+")
+
+PLANNED_MARKER = "Պլանային"
+
+
+class WaterAnnouncement(NamedTuple):
     """
-    Extracts the date from the end of the `text` string and compares it with the current date.
+    Structured fields of a water outage announcement.
+    """
+
+    streets: list
+    start_time: Optional[datetime]
+    end_time: Optional[datetime]
+    publication_date: Optional[date]
+    planned: bool
+
 
-    :param text: The text of the event from which the date is extracted.
-    :return: True if the event is current, False otherwise.
+def extract_publication_date(text):
+    match = PUBLICATION_DATE_RE.search(text)
+    if not match:
+        return None
+    try:
+        return datetime.strptime(match.group(1), "%d.%m.%Y").date()
+    except ValueError as e:
+        logger.error(f"Error parsing date '{match.group(1)}': {e}")
+        return None
+
+
+def extract_outage_window(text, publication_date=None):
     """
+    Returns the timezone-aware start and end of the outage, or (None, None) if the
+    text has no complete date and time window. The year is taken from the
+    publication date, an end before the start means the outage runs overnight.
+    """
+    date_match = OUTAGE_DATE_RE.search(text)
+    time_match = OUTAGE_TIME_RE.search(text)
+    if not date_match or not time_match:
+        return None, None
 
-    date_match = re.search(r"(\d{2}\.\d{2}\.\d{4})թ?\.$", text)
-    if date_match:
-        event_date_str = date_match.group(1)
-        try:
-            event_date = datetime.strptime(event_date_str, "%d.%m.%Y").date()
-            current_date = datetime.now().date()
-            if event_date < current_date:
-                logger.info(f"Skipped outdated water event with date {event_date_str}")
-                return False
-            return True
-        except ValueError as e:
-            logger.error(f"Error parsing date '{event_date_str}': {e}")
-            return False
-    else:
+    base_date = publication_date or datetime.now().date()
+    try:
+        day = date(
+            base_date.year,
+            ARMENIAN_MONTHS[date_match.group(1)],
+            int(date_match.group(2)),
+        )
+    except ValueError:
+        return None, None
+    # Announcements published in December can be about January
+    if day < base_date - timedelta(days=180):
+        day = day.replace(year=day.year + 1)
+
+    start_hour, start_minute, end_hour, end_minute = map(int, time_match.groups())
+    try:
+        start_time = datetime.combine(
+            day, time(start_hour, start_minute), tzinfo=LOCAL_TIMEZONE
+        )
+        end_time = datetime.combine(
+            day, time(end_hour, end_minute), tzinfo=LOCAL_TIMEZONE
+        )
+    except ValueError:
+        return None, None
+    if end_time <= start_time:
+        end_time += timedelta(days=1)
+    return start_time, end_time
+
+
+def extract_streets(text):
+    """
+    Returns the streets and blocks listed as affected by the outage.
+    """
+    match = STREETS_SECTION_RE.search(text)
+    if not match:
+        return []
+    section = LOCALITY_PREFIX_RE.sub("", match.group(1))
+    return [
+        street.strip(" ,")
+        for street in STREET_SEPARATOR_RE.split(section)
+        if street.strip(" ,")
+    ]
+
+
+def extract_water_announcement(heading, text):
+    """
+    Extracts the structured fields of a water announcement from its Armenian text.
+    """
+    publication_date = extract_publication_date(text)
+    start_time, end_time = extract_outage_window(text, publication_date)
+    return WaterAnnouncement(
+        streets=extract_streets(text),
+        start_time=start_time,
+        end_time=end_time,
+        publication_date=publication_date,
+        planned=PLANNED_MARKER in heading,
+    )
+
+
+def filter_by_date(publication_date):
+    """
+    Checks whether an announcement published on `publication_date` is still current.
+    """
+    if publication_date is None:
         logger.warning("Failed to extract date from water event text")
         return False
+    if publication_date < datetime.now().date():
+        logger.info(f"Skipped outdated water event with date {publication_date}")
+        return False
+    return True
 
 
-async def fetch_html(url):
-    """Fetch the HTML content of the given URL asynchronously using aiohttp."""
-    async with aiohttp.ClientSession() as session:
-        async with session.get(url) as response:
-            if response.status == 200:
-                return await response.text()
-            else:
-                logger.error(
-                    f"Failed to fetch URL {url} with status: {response.status}"
-                )
-                return None
+def is_outdated(announcement):
+    """
+    Checks whether an announcement no longer needs to be posted: its outage is over,
+    or, when the outage time is unknown, it is too old for its digest to be kept.
+    Emergency announcements are also only current on the day they are published.
+    """
+    outage_end = announcement.end_time or announcement.start_time
+    if outage_end is not None and outage_end < local_now():
+        logger.info(f"Skipped water event that ended at {outage_end}")
+        return True
+    if not announcement.planned:
+        return not filter_by_date(announcement.publication_date)
+    if outage_end is None and announcement.publication_date is not None:
+        return announcement.publication_date < datetime.now().date() - timedelta(
+            days=EVENT_RETENTION_DAYS
+        )
+    return False
+
+
+def panel_watermark(digests):
+    """
+    Builds the watermark of a page from its panel digests in page order: the
+    identity of the top panel, the number of panels and a fingerprint of all of them.
+    """
+    return {
+        "top_panel": digests[0].hex() if digests else None,
+        "panel_count": len(digests),
+        "fingerprint": hashlib.blake2b(b"".join(digests), digest_size=16).hexdigest(),
+    }
+
+
+def log_watermark_position(previous, digests):
+    if not previous or not previous.get("top_panel"):
+        return
+    hex_digests = [digest.hex() for digest in digests]
+    if previous["top_panel"] in hex_digests:
+        position = hex_digests.index(previous["top_panel"])
+        logger.info(f"Found {position} panels above the last seen top water panel.")
+    else:
+        logger.info("The last seen top water panel is gone from the page.")
 
 
 async def parse_water_events(session):
-    """Parse water events from the fetched HTML page."""
-    html = await fetch_html(WATER_OUTAGE_URL)
-    if not html:
-        logger.error("Failed to retrieve HTML content.")
+    """
+    Parse water events from the fetched HTML page.
+
+    Every panel is hashed, the known ones are resolved with one set lookup and all
+    unknown ones are inserted in one batch, wherever they are on the page. A page
+    whose panels match the stored watermark exits without touching the events.
+    """
+    fetch_result = await fetch_if_changed(
+        session, EventType.WATER, Language.HY, WATER_OUTAGE_URL
+    )
+    if not fetch_result.changed:
+        await session.commit()
         return
 
-    soup = BeautifulSoup(html, "html.parser")
-    new_records_count = 0
-    events = []
+    soup = BeautifulSoup(fetch_result.html, "html.parser")
+    panels = []
 
     for panel in soup.find_all("div", class_="panel"):
         heading = panel.find("div", class_="panel-heading").get_text(strip=True)
         body = panel.find("div", class_="panel-body").get_text(strip=True)
         text = f"{heading}\n\n{body}"
+        panels.append((heading, text, compute_hash_by_text(text)))
 
-        event_hash = compute_hash_by_text(text)
+    digests = [digest for _, _, digest in panels]
+    watermark = panel_watermark(digests)
+    state = fetch_result.state
 
-        existing_event = await session.execute(select(Event).filter_by(hash=event_hash))
-        if existing_event.scalars().first():
-            logger.info(
-                f"Hash {event_hash} already exists in the database. Skipping event and stop parsing."
-            )
-            break
+    if state.watermark and state.watermark["fingerprint"] == watermark["fingerprint"]:
+        logger.info("Water panels did not change since the last run. Skipping...")
+        fetch_result.commit_state()
+        await session.commit()
+        return
+
+    log_watermark_position(state.watermark, digests)
+    new_digests = await filter_new_event_digests(session, digests)
+    events = []
+
+    for heading, text, digest in panels:
+        if digest not in new_digests:
+            continue
 
         timestamp = datetime.now()
-        planned = "Պլանային" in heading
+        announcement = extract_water_announcement(heading, text)
 
-        if not filter_by_date(text) and not planned:
+        if is_outdated(announcement):
             logger.info(f"Event in text '{heading}' was skipped due to date filter.")
             continue
 
-        event_am = Event(
-            event_type=EventType.WATER,
-            area=None,
-            district=None,
-            house_number=None,
-            start_time=None,
-            end_time=None,
-            language=Language.HY,
-            planned=planned,
-            hash=event_hash,
-            text=text,
-            timestamp=timestamp,
-            processed=False,
+        area_match = await area_matcher.find_best(session, heading, Language.HY)
+
+        events.append(
+            {
+                "event_type": EventType.WATER,
+                "language": Language.HY,
+                "area": area_match.area.name if area_match else None,
+                "district": "\n".join(announcement.streets) or None,
+                "start_time": announcement.start_time,
+                "end_time": announcement.end_time,
+                "planned": announcement.planned,
+                "digest": digest,
+                "text": text,
+                "timestamp": timestamp,
+                "processed": False,
+            }
         )
 
-        events.append(event_am)
-        new_records_count += 1
+    fetch_result.commit_state()
+    state.watermark = watermark
 
     if events:
         events.reverse()
-        session.add_all(events)
-        await session.commit()
-        logger.info(f"Added {new_records_count} new water events to the database.")
+        new_event_ids = await bulk_insert_events(session, events)
+        logger.info(f"Added {len(new_event_ids)} new water events to the database.")
     else:
         logger.info("No new water events were found.")
 
+    await session.commit()
+
 
 async def main():
-    async with session_scope() as session:
-        await parse_water_events(session)
+    try:
+        async with session_scope() as session:
+            await parse_water_events(session)
+    finally:
+        await close_http_session()
 
 
 if __name__ == "__main__":
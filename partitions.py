@@ -0,0 +1,165 @@
+from datetime import date, datetime, time, timedelta
+import logging
+import re
+from sqlalchemy import delete, text
+from config import EVENT_PARTITIONS_AHEAD, EVENT_RETENTION_DAYS
+from db import session_scope
+from models import EventDigest
+
+logger = logging.getLogger(__name__)
+
+# Partitioned tables, children first: association partitions are dropped before the
+# event partitions they reference
+PARTITIONED_TABLES = ("post_event_association", "events")
+PARTITION_NAME_RE = re.compile(r"_p(\d{8})$")
+PARTITION_KEYS = {
+    "post_event_association": "event_timestamp",
+    "events": '"timestamp"',
+}
+
+
+def partition_name(table, day):
+    return f"{table}_p{day:%Y%m%d}"
+
+
+def partition_day(name):
+    """
+    Returns the day covered by a daily partition, or None for other partitions.
+    """
+    match = PARTITION_NAME_RE.search(name)
+    if not match:
+        return None
+    return datetime.strptime(match.group(1), "%Y%m%d").date()
+
+
+def partition_ddl(table, day):
+    return (
+        f"CREATE TABLE IF NOT EXISTS {partition_name(table, day)} PARTITION OF {table} "
+        f"FOR VALUES FROM ('{day.isoformat()}') TO ('{(day + timedelta(days=1)).isoformat()}')"
+    )
+
+
+def default_partition_name(table):
+    return f"{table}_default"
+
+
+def default_partition_ddl(table):
+    return (
+        f"CREATE TABLE IF NOT EXISTS {default_partition_name(table)} "
+        f"PARTITION OF {table} DEFAULT"
+    )
+
+
+async def list_partitions(session, table):
+    result = await session.execute(
+        text(
+            "SELECT child.relname FROM pg_inherits "
+            "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+            "JOIN pg_class parent ON parent.oid = pg_inherits.inhparent "
+            "WHERE parent.relname = :table"
+        ),
+        {"table": table},
+    )
+    return result.scalars().all()
+
+
+async def default_partition_days(session, table):
+    """
+    Returns the days of the rows that landed in the default partition of `table`.
+    """
+    result = await session.execute(
+        text(
+            f"SELECT DISTINCT {PARTITION_KEYS[table]}::date "
+            f"FROM {default_partition_name(table)}"
+        )
+    )
+    return set(result.scalars().all())
+
+
+async def create_partitions(session, first_day, last_day):
+    """
+    Creates the missing daily partitions of every partitioned table for the days
+    from `first_day` to `last_day` inclusive.
+
+    A day whose rows already landed in the default partition cannot get its own
+    partition, it is skipped and its rows stay in the default partition until they
+    expire.
+    """
+    for table in reversed(PARTITIONED_TABLES):
+        await session.execute(text(default_partition_ddl(table)))
+        occupied_days = await default_partition_days(session, table)
+        if occupied_days:
+            logger.warning(
+                f"Rows of {', '.join(sorted(map(str, occupied_days)))} landed in "
+                f"{default_partition_name(table)}."
+            )
+
+        day = first_day
+        while day <= last_day:
+            if day not in occupied_days:
+                await session.execute(text(partition_ddl(table, day)))
+            day += timedelta(days=1)
+
+
+async def drop_expired_partitions(session, before_day):
+    """
+    Detaches and drops the daily partitions of the days before `before_day` and
+    deletes the rows of those days from the default partitions. Returns the names of
+    the dropped partitions.
+    """
+    dropped = []
+    for table in PARTITIONED_TABLES:
+        for name in await list_partitions(session, table):
+            if name == default_partition_name(table):
+                result = await session.execute(
+                    text(f"DELETE FROM {name} WHERE {PARTITION_KEYS[table]} < :day"),
+                    {"day": before_day},
+                )
+                if result.rowcount:
+                    logger.info(f"Deleted {result.rowcount} expired rows from {name}.")
+                continue
+
+            day = partition_day(name)
+            if day is None or day >= before_day:
+                continue
+            await session.execute(text(f"ALTER TABLE {table} DETACH PARTITION {name}"))
+            await session.execute(text(f"DROP TABLE {name}"))
+            dropped.append(name)
+    return dropped
+
+
+async def prune_event_digests(session, before_day):
+    """
+    Deletes the digests claimed before `before_day`, whose events were dropped with
+    their partitions. Returns the number of deleted digests.
+    """
+    result = await session.execute(
+        delete(EventDigest).where(
+            EventDigest.created < datetime.combine(before_day, time.min)
+        )
+    )
+    return result.rowcount
+
+
+async def maintain_event_partitions(today=None):
+    """
+    Creates the event partitions for the next EVENT_PARTITIONS_AHEAD days and drops
+    the ones older than EVENT_RETENTION_DAYS.
+    """
+    today = today or date.today()
+    async with session_scope() as session:
+        await create_partitions(
+            session, today, today + timedelta(days=EVENT_PARTITIONS_AHEAD)
+        )
+        dropped = await drop_expired_partitions(
+            session, today - timedelta(days=EVENT_RETENTION_DAYS)
+        )
+        pruned = await prune_event_digests(
+            session, today - timedelta(days=EVENT_RETENTION_DAYS)
+        )
+
+    logger.info(
+        f"Event partitions are ready until {today + timedelta(days=EVENT_PARTITIONS_AHEAD)}, "
+        f"dropped {len(dropped)} expired partitions and {pruned} event digests."
+    )
+    return dropped
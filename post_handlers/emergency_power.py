@@ -1,8 +1,42 @@
+from datetime import datetime, timedelta
+from itertools import groupby
 import logging
-from sqlalchemy import String, func, select, update
-from utils import escape_markdown_v2, get_translation, natural_sort_key
-from models import Event, EventType, PostType
-from orm import get_or_create_area, save_post_to_db
+from typing import NamedTuple, Optional
+from sqlalchemy import (
+    JSON,
+    and_,
+    delete,
+    func,
+    literal_column,
+    select,
+    true,
+    update,
+)
+from sqlalchemy.dialects.postgresql import aggregate_order_by
+from sqlalchemy.orm import aliased
+from config import POWER_COALESCE_WINDOW_MINUTES, POWER_EVENT_WINDOW_HOURS
+from message_packer import (
+    TELEGRAM_MESSAGE_LIMIT,
+    Section,
+    pack_sections,
+    split_oversized,
+    telegram_length,
+)
+from utils import (
+    escape_markdown_v2,
+    format_outage_time,
+    get_translation,
+    local_now,
+)
+from models import (
+    Event,
+    EventType,
+    Language,
+    Post,
+    PostType,
+    post_event_association,
+)
+from orm import PendingPost, get_or_create_area, save_posts_to_db
 
 logger = logging.getLogger(__name__)
 translations = get_translation()
@@ -10,78 +44,321 @@ translations = get_translation()
 
 def generate_house_numbers_section(house_numbers, translate):
     """
-    Helper function to generate and sort the house numbers section using natural sorting.
+    Helper function to generate the house numbers section from already sorted numbers.
     """
     _ = translate
     if house_numbers:
-        house_numbers_list = [
-            hn.strip() for hn in house_numbers.split(",") if hn.strip()
-        ]
-        sorted_house_numbers = sorted(house_numbers_list, key=natural_sort_key)
-        house_numbers = escape_markdown_v2(", ".join(sorted_house_numbers)).strip()
+        house_numbers = escape_markdown_v2(", ".join(house_numbers)).strip()
 
         return _("House Numbers: {}\n\n").format(house_numbers)
     return ""
 
 
-async def generate_emergency_power_posts(session):
-    try:
-        grouped_events = await session.execute(
-            select(
-                Event.start_time,
-                Event.area,
-                Event.district,
-                Event.language,
-                Event.event_type,
-                func.string_agg(func.cast(Event.id, String), ",").label("event_ids"),
-                func.string_agg(Event.house_number, ", ").label("house_numbers"),
-            )
-            .filter(
-                Event.processed.is_(False),
-                Event.event_type == EventType.POWER,
-                Event.planned.is_(False),
-                (Event.area.isnot(None))
-                | (Event.district.isnot(None))
-                | (Event.house_number.isnot(None)),
-            )
-            .group_by(
-                Event.start_time,
-                Event.area,
-                Event.district,
-                Event.language,
-                Event.event_type,
-            )
+def emergency_power_groups_query(window_start):
+    """
+    Groups the unprocessed emergency power events into one row per area, language and
+    start time, with a json array of its districts in order. Each district carries
+    its event ids and its unique house numbers in natural order, using the sort keys
+    stored at ingest.
+    """
+    pending = (
+        select(
+            Event.id,
+            Event.area,
+            Event.start_time,
+            Event.language,
+            Event.district,
+            Event.house_numbers,
+            Event.house_number_keys,
         )
-        grouped_events = grouped_events.all()
+        .filter(
+            Event.processed.is_(False),
+            Event.event_type == EventType.POWER,
+            Event.planned.is_(False),
+            Event.start_time >= window_start,
+            (Event.area.isnot(None))
+            | (Event.district.isnot(None))
+            | (Event.house_number.isnot(None)),
+        )
+        .cte("pending")
+    )
 
-        logger.info(
-            f"Found {len(grouped_events)} grouped unprocessed emergency power events."
+    numbers = (
+        func.unnest(pending.c.house_numbers, pending.c.house_number_keys)
+        .table_valued("number", "sort_key")
+        .render_derived(name="numbers")
+        .lateral()
+    )
+    unique_numbers = (
+        select(
+            pending.c.area,
+            pending.c.start_time,
+            pending.c.language,
+            pending.c.district,
+            numbers.c.number,
+            numbers.c.sort_key,
+        )
+        .distinct()
+        .select_from(pending.join(numbers, true()))
+        .subquery("unique_numbers")
+    )
+    district_numbers = (
+        select(
+            unique_numbers.c.area,
+            unique_numbers.c.start_time,
+            unique_numbers.c.language,
+            unique_numbers.c.district,
+            func.json_agg(
+                aggregate_order_by(
+                    unique_numbers.c.number,
+                    # Byte order, the keys are built for plain string comparison
+                    unique_numbers.c.sort_key.collate("C"),
+                    unique_numbers.c.number,
+                )
+            ).label("house_numbers"),
+        )
+        .group_by(
+            unique_numbers.c.area,
+            unique_numbers.c.start_time,
+            unique_numbers.c.language,
+            unique_numbers.c.district,
+        )
+        .cte("district_numbers")
+    )
+    district_events = (
+        select(
+            pending.c.area,
+            pending.c.start_time,
+            pending.c.language,
+            pending.c.district,
+            func.array_agg(aggregate_order_by(pending.c.id, pending.c.id)).label(
+                "event_ids"
+            ),
+        )
+        .group_by(
+            pending.c.area,
+            pending.c.start_time,
+            pending.c.language,
+            pending.c.district,
+        )
+        .cte("district_events")
+    )
+
+    district = func.json_build_object(
+        "district",
+        district_events.c.district,
+        "house_numbers",
+        func.coalesce(district_numbers.c.house_numbers, literal_column("'[]'::json")),
+        "event_ids",
+        district_events.c.event_ids,
+    )
+    return (
+        select(
+            district_events.c.area,
+            district_events.c.start_time,
+            district_events.c.language,
+            func.json_agg(
+                aggregate_order_by(
+                    district, district_events.c.district.collate("C").nulls_first()
+                ),
+                type_=JSON,
+            ).label("districts"),
+        )
+        .select_from(
+            district_events.outerjoin(
+                district_numbers,
+                and_(
+                    *(
+                        district_numbers.c[column].is_not_distinct_from(
+                            district_events.c[column]
+                        )
+                        for column in ("area", "start_time", "language", "district")
+                    )
+                ),
+            )
         )
+        .group_by(
+            district_events.c.area,
+            district_events.c.start_time,
+            district_events.c.language,
+        )
+        .order_by(
+            district_events.c.area,
+            district_events.c.language,
+            district_events.c.start_time,
+        )
+    )
+
+
+def format_start_time(start_time):
+    return (
+        f"*{escape_markdown_v2(format_outage_time(start_time))}*" if start_time else ""
+    )
+
+
+def restored_notice(translate):
+    """
+    Returns the notice prepended to an emergency power post once power is restored.
+    """
+    _ = translate
+    return f"✅ *{escape_markdown_v2(_('Power restored'))}* ✅\n\n"
+
+
+class PostCluster(NamedTuple):
+    """
+    Emergency outages of one area starting close enough to share a post, as
+    (start_time, districts) pairs in start time order.
+    """
+
+    area: Optional[str]
+    language: Language
+    outages: list
+
+
+def coalesce_post_groups(post_groups, window):
+    """
+    Merges the (area, start_time, language, districts) rows of
+    `emergency_power_groups_query` into post clusters. An outage joins the cluster
+    of its area and language when it starts at most `window` after the first
+    outage of that cluster.
+    """
+    clusters = []
+    for (area, language), rows in groupby(
+        post_groups, key=lambda row: (row[0], row[2])
+    ):
+        cluster = None
+        for row_area, start_time, row_language, districts in rows:
+            if cluster is None or start_time - cluster.outages[0][0] > window:
+                cluster = PostCluster(area, language, [])
+                clusters.append(cluster)
+            cluster.outages.append((start_time, districts))
+    return clusters
+
 
-        posts_by_area_and_time = {}
+def with_heading(heading, sections, capacity):
+    """
+    Joins district sections under a heading into as few sections of at most
+    `capacity` as possible, repeating the heading in each of them. A section too
+    long to fit under the heading is split, every piece covering its events.
+    """
+    heading_length = telegram_length(heading)
+    grouped = []
+    texts, event_ids, length = [], [], heading_length
+    for section in sections:
+        for piece in split_oversized(section.text, capacity - heading_length):
+            piece_length = telegram_length(piece)
+            if texts and length + piece_length > capacity:
+                grouped.append(Section(heading + "".join(texts), event_ids))
+                texts, event_ids, length = [], [], heading_length
+            texts.append(piece)
+            event_ids = event_ids + [
+                event_id for event_id in section.event_ids if event_id not in event_ids
+            ]
+            length += piece_length
+    if texts:
+        grouped.append(Section(heading + "".join(texts), event_ids))
+    return grouped
 
-        for group in grouped_events:
-            event_ids = [int(event_id) for event_id in group.event_ids.split(",")]
-            logger.info(f"Processing group with event IDs: {event_ids}")
 
-            group_key = (group.area, group.start_time, group.language)
-            if group_key not in posts_by_area_and_time:
-                posts_by_area_and_time[group_key] = []
+async def reopen_unsent_power_posts(session, window_start, window):
+    """
+    Deletes the unsent emergency power posts that new events should be coalesced
+    into and marks their events unprocessed, so they are generated again together
+    with the new events. Posts locked by the sender are left alone. Returns the
+    number of reopened posts.
+    """
+    posted_event = aliased(Event)
+    new_event = aliased(Event)
+    coalescible_posts = (
+        select(post_event_association.c.post_id)
+        .join(
+            posted_event,
+            and_(
+                posted_event.id == post_event_association.c.event_id,
+                posted_event.timestamp == post_event_association.c.event_timestamp,
+            ),
+        )
+        .join(
+            new_event,
+            and_(
+                new_event.area.is_not_distinct_from(posted_event.area),
+                new_event.language == posted_event.language,
+                new_event.processed.is_(False),
+                new_event.event_type == EventType.POWER,
+                new_event.planned.is_(False),
+                new_event.start_time >= window_start,
+                new_event.start_time.between(
+                    posted_event.start_time - window, posted_event.start_time + window
+                ),
+            ),
+        )
+    )
+    # Reopened events must be picked up again by the groups query
+    expired_posts = (
+        select(post_event_association.c.post_id)
+        .join(
+            Event,
+            and_(
+                Event.id == post_event_association.c.event_id,
+                Event.timestamp == post_event_association.c.event_timestamp,
+            ),
+        )
+        .filter(Event.start_time < window_start)
+    )
+    result = await session.execute(
+        select(Post.id)
+        .filter(
+            Post.posted_time.is_(None),
+            Post.restored_time.is_(None),
+            Post.post_type == PostType.EMERGENCY_POWER,
+            Post.id.in_(coalescible_posts),
+            Post.id.not_in(expired_posts),
+        )
+        .with_for_update(skip_locked=True)
+    )
+    post_ids = result.scalars().all()
+    if not post_ids:
+        return 0
 
-            posts_by_area_and_time[group_key].append(
-                {
-                    "district": group.district,
-                    "house_numbers": group.house_numbers,
-                    "event_type": group.event_type,
-                    "event_ids": event_ids,
-                }
+    await session.execute(
+        update(Event)
+        .where(
+            Event.id.in_(
+                select(post_event_association.c.event_id).filter(
+                    post_event_association.c.post_id.in_(post_ids)
+                )
             )
+        )
+        .values(processed=False)
+        .execution_options(synchronize_session=False)
+    )
+    await session.execute(
+        delete(Post)
+        .where(Post.id.in_(post_ids))
+        .execution_options(synchronize_session=False)
+    )
+    logger.info(f"Reopened {len(post_ids)} unsent emergency power posts.")
+    return len(post_ids)
 
-        for (
-            area,
-            start_time,
-            language,
-        ), events_group in posts_by_area_and_time.items():
+
+async def generate_emergency_power_posts(session):
+    try:
+        window_start = local_now() - timedelta(hours=POWER_EVENT_WINDOW_HOURS)
+        window = timedelta(minutes=POWER_COALESCE_WINDOW_MINUTES)
+        await reopen_unsent_power_posts(session, window_start, window)
+
+        result = await session.execute(emergency_power_groups_query(window_start))
+        post_groups = result.all()
+        clusters = coalesce_post_groups(post_groups, window)
+
+        logger.info(
+            f"Found {len(post_groups)} groups of unprocessed emergency power events, "
+            f"coalesced into {len(clusters)} posts."
+        )
+
+        pending_posts = []
+
+        for area, language, outages in clusters:
             _ = translations[language.name]
 
             db_area = await get_or_create_area(session, area, language)
@@ -89,57 +366,70 @@ async def generate_emergency_power_posts(session):
             title = f"⚡️ {_('Emergency power outage')} ⚡️"
 
             formatted_area = f"*{escape_markdown_v2(area.strip())}*" if area else ""
-            formatted_time = (
-                f"*{escape_markdown_v2(start_time.strip())}*" if start_time else ""
-            )
+            # Leave room for the notice prepended once the power is restored
+            limit = TELEGRAM_MESSAGE_LIMIT - telegram_length(restored_notice(_))
 
-            post_text = f"*{title}*\n\n{formatted_area}\n{formatted_time}\n\n"
-            all_event_ids = []
+            if len(outages) == 1:
+                header = (
+                    f"*{title}*\n\n{formatted_area}\n"
+                    f"{format_start_time(outages[0][0])}\n\n"
+                )
+            else:
+                header = f"*{title}*\n\n{formatted_area}\n\n"
+            capacity = limit - telegram_length(header)
 
-            sorted_events = sorted(events_group, key=lambda e: e["district"] or "")
+            sections = []
+            for start_time, districts in outages:
+                district_sections = []
+                for event in districts:
+                    logger.info(
+                        f"Processing group with event IDs: {event['event_ids']}"
+                    )
+                    formatted_district = (
+                        f"{escape_markdown_v2(event['district'].strip())}\n"
+                        if event["district"]
+                        else ""
+                    )
+                    formatted_house_numbers = generate_house_numbers_section(
+                        event["house_numbers"], _
+                    )
+                    district_sections.append(
+                        Section(
+                            f"{formatted_district}{formatted_house_numbers}\n",
+                            event["event_ids"],
+                        )
+                    )
 
-            for event in sorted_events:
-                formatted_district = (
-                    f"{escape_markdown_v2(event['district'].strip())}\n"
-                    if event["district"]
-                    else ""
-                )
-                formatted_house_numbers = generate_house_numbers_section(
-                    event["house_numbers"], _
-                )
-                event_message = f"{formatted_district}{formatted_house_numbers}\n"
+                if len(outages) == 1:
+                    sections.extend(district_sections)
+                else:
+                    sections.extend(
+                        with_heading(
+                            f"{format_start_time(start_time)}\n\n",
+                            district_sections,
+                            capacity,
+                        )
+                    )
 
-                if len(post_text) + len(event_message) > 4096:
-                    await save_post_to_db(
-                        session,
+            for chunk in pack_sections(header, sections, limit):
+                pending_posts.append(
+                    PendingPost(
                         PostType.EMERGENCY_POWER,
-                        post_text,
-                        all_event_ids,
+                        chunk.text,
+                        chunk.event_ids,
                         language,
                         db_area,
                     )
-                    post_text = (
-                        f"*{title}*\n{formatted_area}\n{formatted_time}\n"
-                        + event_message
-                    )
-                    all_event_ids = event["event_ids"]
-                else:
-                    post_text += event_message
-                    all_event_ids.extend(event["event_ids"])
-
-            if post_text:
-                await save_post_to_db(
-                    session,
-                    PostType.EMERGENCY_POWER,
-                    post_text,
-                    all_event_ids,
-                    language,
-                    db_area,
                 )
 
+        await save_posts_to_db(session, pending_posts)
+        processed_event_ids = [
+            event_id for pending in pending_posts for event_id in pending.event_ids
+        ]
+        if processed_event_ids:
             await session.execute(
                 update(Event)
-                .where(Event.id.in_(all_event_ids))
+                .where(Event.id.in_(processed_event_ids))
                 .values(processed=True)
                 .execution_options(synchronize_session=False)
             )
@@ -151,3 +441,34 @@ async def generate_emergency_power_posts(session):
         await session.rollback()
         logger.error(f"Error while processing events and generating posts: {e}")
         raise
+
+
+async def mark_restored_power_posts(session):
+    """
+    Marks emergency power posts whose events all disappeared from the ENA table
+    as restored and prepends a restoration notice to their text. Posts sent without
+    a stored message id cannot be edited, so they are left alone.
+    """
+    unresolved_posts = (
+        select(post_event_association.c.post_id)
+        .join(Event, Event.id == post_event_association.c.event_id)
+        .filter(Event.resolved_time.is_(None))
+    )
+    result = await session.execute(
+        select(Post).filter(
+            Post.post_type == PostType.EMERGENCY_POWER,
+            Post.restored_time.is_(None),
+            Post.message_id.isnot(None) | Post.posted_time.is_(None),
+            Post.id.in_(select(post_event_association.c.post_id)),
+            Post.id.not_in(unresolved_posts),
+        )
+    )
+    restored_posts = result.scalars().all()
+
+    for post in restored_posts:
+        _ = translations[post.language.name]
+        post.text = f"{restored_notice(_)}{post.text}"
+        post.restored_time = datetime.now()
+
+    await session.commit()
+    logger.info(f"Marked {len(restored_posts)} emergency power posts as restored.")
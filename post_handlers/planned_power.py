@@ -1,11 +1,12 @@
-import aiohttp
 import json
 import logging
 
 import openai
+from http_client import get_http_session
+from message_packer import Section, pack_sections
 from utils import escape_markdown_v2, get_translation
 from models import Language, PostType
-from orm import get_or_create_area, save_post_to_db
+from orm import PendingPost, get_or_create_area, save_posts_to_db
 
 
 logger = logging.getLogger(__name__)
@@ -91,25 +92,24 @@ Now, please parse the following text:
 {content}
 """
 
-    async with aiohttp.ClientSession() as session:
-        async with session.post(
-            "https://api.openai.com/v1/completions",
-            json={
-                "model": "text-davinci-003",
-                "prompt": prompt,
-                "max_tokens": 1000,
-                "temperature": 0.2,
-            },
-            headers={"Authorization": f"Bearer {openai.api_key}"},
-        ) as response:
-            if response.status != 200:
-                logger.error(f"Failed to get completion from OpenAI: {response.status}")
-                return None
-
-            response_data = await response.json()
-            parsed_data = response_data["choices"][0]["text"].strip()
-            logger.debug(f"Received parsed data: {parsed_data}")
-            return parsed_data
+    async with get_http_session().post(
+        "https://api.openai.com/v1/completions",
+        json={
+            "model": "text-davinci-003",
+            "prompt": prompt,
+            "max_tokens": 1000,
+            "temperature": 0.2,
+        },
+        headers={"Authorization": f"Bearer {openai.api_key}"},
+    ) as response:
+        if response.status != 200:
+            logger.error(f"Failed to get completion from OpenAI: {response.status}")
+            return None
+
+        response_data = await response.json()
+        parsed_data = response_data["choices"][0]["text"].strip()
+        logger.debug(f"Received parsed data: {parsed_data}")
+        return parsed_data
 
 
 async def generate_planned_power_post(session, parsed_event, original_event_id):
@@ -118,6 +118,7 @@ async def generate_planned_power_post(session, parsed_event, original_event_id):
     try:
         event_data_list = json.loads(parsed_event)
         logger.debug(f"Event data parsed as JSON: {event_data_list}")
+        pending_posts = []
 
         for event_data in event_data_list:
             start_time = event_data["start_time"]
@@ -126,36 +127,39 @@ async def generate_planned_power_post(session, parsed_event, original_event_id):
             text = event_data["text"]
             language = event_data["language"]
 
-            _ = translations[language.name]
-            title = f"⚡️ {_('Scheduled power outage')} ⚡️"
-
             try:
                 lang_enum = Language[language]
             except KeyError:
                 logger.error(f"Unknown language code: {language}")
                 continue
 
+            _ = translations[lang_enum.name]
+            title = f"⚡️ {_('Scheduled power outage')} ⚡️"
+
             escaped_area = escape_markdown_v2(area)
             escaped_time = escape_markdown_v2(f"{start_time} - {end_time}")
             escaped_text = escape_markdown_v2(text)
 
             db_area = await get_or_create_area(session, area, lang_enum)
 
-            post_text = (
-                f"**{title}**\n**{escaped_area}**\n**{escaped_time}**\n\n{escaped_text}"
-            )
-            await save_post_to_db(
-                session,
-                post_type=PostType.PLANNED_POWER,
-                language=lang_enum,
-                area=db_area,
-                text=post_text,
-                events=[original_event_id],
+            header = f"**{title}**\n**{escaped_area}**\n**{escaped_time}**\n\n"
+            pending_posts.extend(
+                PendingPost(
+                    PostType.SCHEDULED_POWER,
+                    chunk.text,
+                    chunk.event_ids,
+                    lang_enum,
+                    db_area,
+                )
+                for chunk in pack_sections(
+                    header, [Section(escaped_text, [original_event_id])]
+                )
             )
 
-        session.commit()
+        await save_posts_to_db(session, pending_posts)
+        await session.commit()
         logger.info("Posts have been committed to the database.")
 
     except Exception as e:
         logger.error(f"Error while processing parsed event: {e}")
-        session.rollback()
+        await session.rollback()
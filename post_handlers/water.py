@@ -1,10 +1,17 @@
-from datetime import datetime
+import asyncio
 import logging
-import re
-from models import Area, Event, EventType, Language, PostType
-from orm import save_post_to_db
-from utils import escape_markdown_v2, get_translation, normalize_text, translate_text
-from sqlite3 import IntegrityError
+from area_matcher import area_matcher, most_specific
+from area_registry import area_registry
+from message_packer import Section, pack_sections
+from models import Event, EventType, Language, PostType
+from orm import PendingPost, save_posts_to_db
+from utils import (
+    escape_markdown_v2,
+    format_outage_window,
+    get_translation,
+    translate_text,
+)
+from sqlalchemy import update
 from sqlalchemy.future import select
 
 logger = logging.getLogger(__name__)
@@ -13,87 +20,53 @@ translations = get_translation()
 
 async def find_area(session, header, language):
     """
-    Find the area name in the given header text using the language-specific area names.
+    Find the most specific area mentioned in the given header text using the
+    language-specific area names.
     """
-    normalized_header = normalize_text(header)
-    all_areas = await session.execute(select(Area).filter_by(language=language))
-    all_areas = all_areas.scalars().all()
-
-    for area in all_areas:
-        if area.name.upper() in normalized_header:
-            return area
-
-
-def extract_date_time(text):
-    """
-    Extracts date and time from the given text using regex and returns them in the required format.
-    """
-    # Regex to find date (e.g., օգոստոսի 31-ին)
-    date_pattern = r"(հունվարի|փետրվարի|մարտի|ապրիլի|մայիսի|հունիսի|հուլիսի|օգոստոսի|սեպտեմբերի|հոկտեմբերի|նոյեմբերի|դեկտեմբերի) (\d{1,2})"
-    month_map = {
-        "հունվարի": "01",
-        "փետրվարի": "02",
-        "մարտի": "03",
-        "ապրիլի": "04",
-        "մայիսի": "05",
-        "հունիսի": "06",
-        "հուլիսի": "07",
-        "օգոստոսի": "08",
-        "սեպտեմբերի": "09",
-        "հոկտեմբերի": "10",
-        "նոյեմբերի": "11",
-        "դեկտեմբերի": "12",
-    }
-
-    # Regex to find time range (e.g., 13:00-17:00)
-    time_pattern = r"(\d{1,2}:\d{2})-(\d{1,2}:\d{2})"
-
-    # Find matches in the text
-    date_match = re.search(date_pattern, text)
-    time_match = re.search(time_pattern, text)
-
-    if date_match:
-        # Extract the month and day from the match
-        month_name = date_match.group(1)
-        day = date_match.group(2).zfill(2)  # Ensure day is always two digits
-        month = month_map.get(month_name)
-
-        # Use the current year
-        current_year = datetime.now().year
-
-        # Format the date as DD.MM.YYYY
-        formatted_date = f"{day}.{month}.{current_year}"
-    else:
-        formatted_date = None
-
-    if time_match:
-        # Extract start and end times
-        start_time = time_match.group(1)
-        end_time = time_match.group(2)
-
-        # Combine date and time
-        if formatted_date:
-            formatted_date_time = f"{formatted_date} {start_time}-{end_time}"
-        else:
-            formatted_date_time = None
-    else:
-        formatted_date_time = None
-
-    return formatted_date_time
+    matches = await area_matcher.find_all(session, header, language)
+    if len(matches) > 1:
+        logger.debug(
+            "Several areas matched in the header: "
+            + ", ".join(f"{m.area.name} at {m.start}-{m.end}" for m in matches)
+        )
+    best_match = most_specific(matches)
+    return best_match.area if best_match else None
 
 
-async def generate_water_posts(session):
-    unprocessed_water_events = await session.execute(
-        select(Event).filter(
+def unprocessed_water_events_query():
+    return (
+        select(Event)
+        .filter(
             Event.processed.is_(False),
             Event.event_type == EventType.WATER,
             Event.language == Language.HY,
         )
+        .order_by(Event.id)
     )
+
+
+async def generate_water_posts(session):
+    unprocessed_water_events = await session.execute(unprocessed_water_events_query())
     unprocessed_water_events = unprocessed_water_events.scalars().all()
 
-    for event in unprocessed_water_events:
-        translation_ru, translation_en = await translate_text(event.text)
+    # Translate all events concurrently; the number of requests in flight is
+    # bounded by the translation semaphore in utils.
+    all_translations = await asyncio.gather(
+        *(translate_text(event.text) for event in unprocessed_water_events),
+        return_exceptions=True,
+    )
+
+    pending_posts = []
+    processed_event_ids = []
+
+    for event, translations_result in zip(unprocessed_water_events, all_translations):
+        if isinstance(translations_result, Exception):
+            logger.error(
+                f"Failed to translate water event {event.id}: {translations_result}"
+            )
+            continue
+
+        translation_ru, translation_en = translations_result
         google_translations = [
             (Language.HY, event.text),
             (Language.RU, translation_ru),
@@ -105,7 +78,12 @@ async def generate_water_posts(session):
                 header, text = (
                     content.split("\n\n", 1) if "\n\n" in content else (content, "")
                 )
-                area = await find_area(session, header, language)
+                # The Armenian area is matched once at ingest, translated headers
+                # are matched against the areas of their own language
+                if language == Language.HY and event.area:
+                    area = await area_registry.get(session, event.area, language)
+                else:
+                    area = await find_area(session, header, language)
 
                 if area:
                     logger.info(
@@ -124,7 +102,9 @@ async def generate_water_posts(session):
                 )
 
                 area_text = f"*{escape_markdown_v2(area.name)}*\n" if area else ""
-                formatted_date_time = extract_date_time(event.text)
+                formatted_date_time = format_outage_window(
+                    event.start_time, event.end_time
+                )
                 date_time_text = (
                     f"*{escape_markdown_v2(formatted_date_time)}*\n"
                     if formatted_date_time
@@ -132,30 +112,47 @@ async def generate_water_posts(session):
                 )
                 escaped_header = escape_markdown_v2(header)
                 escaped_text = escape_markdown_v2(text)
-                post_text = f"*{title}*\n\n{area_text}{date_time_text}\n{escaped_header}\n\n{escaped_text}"
-
-                await save_post_to_db(
-                    session,
-                    post_type=(
-                        PostType.SCHEDULED_WATER
-                        if event.planned
-                        else PostType.EMERGENCY_WATER
-                    ),
-                    text=post_text,
-                    event_ids=[event.id],
-                    language=language,
-                    area=area,
+                chunks = pack_sections(
+                    f"*{title}*\n\n{area_text}{date_time_text}\n",
+                    [Section(f"{escaped_header}\n\n{escaped_text}", [event.id])],
                 )
 
-            event.processed = True
-            await session.commit()
+                pending_posts.extend(
+                    PendingPost(
+                        post_type=(
+                            PostType.SCHEDULED_WATER
+                            if event.planned
+                            else PostType.EMERGENCY_WATER
+                        ),
+                        text=chunk.text,
+                        event_ids=chunk.event_ids,
+                        language=language,
+                        area=area,
+                    )
+                    for chunk in chunks
+                )
+
+            processed_event_ids.append(event.id)
 
-        except IntegrityError as e:
-            await session.rollback()
-            logger.error(
-                f"Failed to insert water event {event.id} due to IntegrityError: {e}"
-            )
         except Exception as e:
             await session.rollback()
             logger.error(f"Failed to process water event {event.id}: {e}")
             raise
+
+    try:
+        await save_posts_to_db(session, pending_posts)
+        if processed_event_ids:
+            await session.execute(
+                update(Event)
+                .where(Event.id.in_(processed_event_ids))
+                .values(processed=True)
+                .execution_options(synchronize_session=False)
+            )
+        await session.commit()
+        logger.info(
+            f"Saved {len(pending_posts)} water posts for {len(processed_event_ids)} events."
+        )
+    except Exception as e:
+        await session.rollback()
+        logger.error(f"Failed to save water posts: {e}")
+        raise
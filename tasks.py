@@ -1,56 +1,110 @@
 import asyncio
-from datetime import datetime, timedelta
+from datetime import datetime
 import logging
 from sqlalchemy.future import select
-from telegram.error import RetryAfter, TimedOut, NetworkError
+from telegram.error import BadRequest, RetryAfter, TimedOut, NetworkError
 from telegram.ext import CallbackContext
-from post_handlers.emergency_power import generate_emergency_power_posts
+from post_handlers.emergency_power import (
+    generate_emergency_power_posts,
+    mark_restored_power_posts,
+)
 from post_handlers.water import generate_water_posts
+from config import MAX_POST_EDIT_ATTEMPTS
 from db import session_scope
-from models import Event, Post, PostType
+from models import Post, PostType
 from parsers.power_parser import parse_emergency_power_events
 from parsers.water_parser import parse_water_events
+from partitions import maintain_event_partitions
 from utils import get_channel_id
 
 logger = logging.getLogger(__name__)
 
 MESSAGE_DELAY = 2  # seconds
+# Edit errors after which the channel message needs no further edit
+SETTLED_EDIT_ERRORS = ("message is not modified", "message to edit not found")
+
+
+def unsent_power_posts_query():
+    return (
+        select(Post)
+        .filter(
+            Post.posted_time.is_(None),
+            Post.restored_time.is_(None),
+            Post.post_type == PostType.EMERGENCY_POWER,
+        )
+        .order_by(Post.creation_time)
+    )
+
+
+def restored_power_posts_query():
+    return (
+        select(Post)
+        .filter(
+            Post.restored_time.isnot(None),
+            Post.edited_time.is_(None),
+            Post.message_id.isnot(None),
+            Post.post_type == PostType.EMERGENCY_POWER,
+        )
+        .order_by(Post.restored_time)
+    )
+
+
+def unsent_water_posts_query():
+    return (
+        select(Post)
+        .filter(
+            Post.posted_time.is_(None),
+            Post.post_type.in_([PostType.EMERGENCY_WATER, PostType.SCHEDULED_WATER]),
+        )
+        .order_by(Post.creation_time)
+    )
 
 
 async def send_emergency_power_posts(context: CallbackContext) -> None:
     logger.info("Sending unsent power posts...")
     async with session_scope() as session:
-        result = await session.execute(
-            select(Post)
-            .filter(
-                Post.posted_time.is_(None),
-                Post.post_type == PostType.EMERGENCY_POWER,
-            )
-            .order_by(Post.creation_time)
-        )
+        result = await session.execute(unsent_power_posts_query())
         unsent_emergency_power_posts = result.scalars().all()
 
         for post in unsent_emergency_power_posts:
+            # Generation may reopen unsent posts to coalesce new events into them,
+            # the row lock keeps a post from being sent and reopened at once
+            if not await lock_unsent_post(session, post):
+                continue
             result = await send_post_to_channel(context, post, session)
             if not result:
                 break
 
         logger.info("Finished sending all unsent power posts.")
 
+        result = await session.execute(restored_power_posts_query())
+        restored_posts = result.scalars().all()
+
+        for post in restored_posts:
+            result = await edit_post_in_channel(context, post, session)
+            if not result:
+                break
+
+        logger.info("Finished editing restored power posts.")
+
+
+async def lock_unsent_post(session, post) -> bool:
+    """
+    Locks the row of an unsent post until the next commit. Returns False when the
+    post was sent, reopened or is locked by another transaction.
+    """
+    result = await session.execute(
+        select(Post.id)
+        .filter(Post.id == post.id, Post.posted_time.is_(None))
+        .with_for_update(skip_locked=True)
+    )
+    return result.scalar() is not None
+
 
 async def send_water_posts(context: CallbackContext) -> None:
     logger.info("Sending unsent water posts...")
     async with session_scope() as session:
-        result = await session.execute(
-            select(Post)
-            .filter(
-                Post.posted_time.is_(None),
-                Post.post_type.in_(
-                    [PostType.EMERGENCY_WATER, PostType.SCHEDULED_WATER]
-                ),
-            )
-            .order_by(Post.creation_time)
-        )
+        result = await session.execute(unsent_water_posts_query())
         unsent_posts = result.scalars().all()
 
         for post in unsent_posts:
@@ -66,10 +120,11 @@ async def send_post_to_channel(context: CallbackContext, post: Post, session) ->
         channel_id = get_channel_id(post.language)
 
         if channel_id:
-            await context.bot.send_message(
+            message = await context.bot.send_message(
                 chat_id=channel_id, text=post.text, parse_mode="MarkdownV2"
             )
             post.posted_time = datetime.now()
+            post.message_id = message.message_id
             await session.commit()
             logger.info(f"Sent post ID {post.id} to channel {channel_id}.")
         else:
@@ -99,14 +154,78 @@ async def send_post_to_channel(context: CallbackContext, post: Post, session) ->
         return False
 
 
+async def edit_post_in_channel(context: CallbackContext, post: Post, session) -> bool:
+    try:
+        channel_id = get_channel_id(post.language)
+
+        if channel_id:
+            await context.bot.edit_message_text(
+                chat_id=channel_id,
+                message_id=post.message_id,
+                text=post.text,
+                parse_mode="MarkdownV2",
+            )
+            post.edited_time = datetime.now()
+            await session.commit()
+            logger.info(f"Edited post ID {post.id} in channel {channel_id}.")
+        else:
+            logger.error(f"Invalid channel ID for language {post.language}.")
+            return False
+
+        await asyncio.sleep(MESSAGE_DELAY)
+        return True
+
+    except RetryAfter as e:
+        retry_after = e.retry_after
+        logger.error(
+            f"Flood control exceeded. Retry in {retry_after} seconds for post ID {post.id}."
+        )
+        await asyncio.sleep(retry_after + MESSAGE_DELAY)
+        return await edit_post_in_channel(context, post, session)
+
+    except BadRequest as e:
+        if any(reason in str(e).lower() for reason in SETTLED_EDIT_ERRORS):
+            # The message was deleted or already has this text; do not retry it forever
+            logger.warning(f"Post ID {post.id} needs no edit: {e}")
+            post.edited_time = datetime.now()
+            await session.commit()
+        else:
+            # Give up on edits Telegram keeps rejecting instead of retrying forever
+            post.edit_attempts += 1
+            if post.edit_attempts >= MAX_POST_EDIT_ATTEMPTS:
+                logger.error(
+                    f"Giving up on editing post ID {post.id} after "
+                    f"{post.edit_attempts} attempts: {e}"
+                )
+                post.edited_time = datetime.now()
+            else:
+                logger.error(f"Failed to edit post ID {post.id}: {e}")
+            await session.commit()
+        return True
+
+    except (TimedOut, NetworkError) as e:
+        logger.error(
+            f"Temporary network error for post ID {post.id}: {e}. Will retry later."
+        )
+        return False
+
+    except Exception as e:
+        logger.error(f"Failed to edit post ID {post.id} due to unexpected error: {e}")
+        await session.rollback()
+        return False
+
+
 async def update_and_create_power_posts(context: CallbackContext) -> None:
-    async with session_scope() as session:
-        logger.info("Checking for updates...")
-        await parse_emergency_power_events(session)
+    logger.info("Checking for updates...")
+    await parse_emergency_power_events()
 
+    async with session_scope() as session:
         logger.info("Creating emergency power posts...")
         await generate_emergency_power_posts(session)
 
+        logger.info("Marking restored emergency power posts...")
+        await mark_restored_power_posts(session)
+
 
 async def update_and_create_water_posts(context: CallbackContext) -> None:
     async with session_scope() as session:
@@ -117,36 +236,11 @@ async def update_and_create_water_posts(context: CallbackContext) -> None:
         await generate_water_posts(session)
 
 
-async def cleanup_outdated_events(context: CallbackContext) -> None:
-    logger.info("Starting cleanup of outdated events from the database.")
-    async with session_scope() as session:
-        try:
-            threshold_time = datetime.now() - timedelta(days=3)
-
-            while True:
-                logger.info("Executing select query to find outdated events.")
-                result = await session.execute(
-                    select(Event).filter(Event.timestamp < threshold_time).limit(1000)
-                )
-                outdated_events = result.scalars().all()
-
-                logger.info(f"Found {len(outdated_events)} outdated events.")
-
-                if not outdated_events:
-                    logger.info("No more outdated events to delete.")
-                    break
-
-                event_ids = [event.id for event in outdated_events]
-                logger.info(f"Deleting {len(event_ids)} events.")
-
-                await session.execute(
-                    Event.__table__.delete().where(Event.id.in_(event_ids))
-                )
-
-                await session.commit()
-                logger.info(f"Deleted {len(outdated_events)} outdated events.")
-
-            logger.info("Cleanup of outdated events completed successfully.")
-        except Exception as e:
-            await session.rollback()
-            logger.error(f"Error during cleanup of outdated events: {e}")
+async def rotate_event_partitions(context: CallbackContext) -> None:
+    """
+    Creates upcoming event partitions and drops the expired ones.
+    """
+    try:
+        await maintain_event_partitions()
+    except Exception as e:
+        logger.error(f"Error during event partition maintenance: {e}")
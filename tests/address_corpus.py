@@ -0,0 +1,55 @@
+"""
+Generated corpus of ENA-style addresses for split_address tests and benchmarks.
+"""
+
+import random
+
+AREAS = ["г.ЕРЕВАН", "г.АБОВЯН", "с.АРИНДЖ", "Ք.ԵՐԵՎԱՆ", "YEREVAN", "Գ.ՊՏՂՆԻ", " г.ГЮМРИ "]
+DISTRICTS = [
+    "БАШИНДЖАГЯН УЛ.",
+    "БАШИНДЖАГЯН УЛ. 2",
+    "САДОВАЯ ул. 1 проезд",
+    "НОРКИ 2 ул. 1 проезд",
+    "УЛИЦА АРШАКЯНЦА",
+    "НАЗАРБЕКЯН КВАРТ.",
+    "25 корп.",
+    "ՄԱԶՄԱՆՅԱՆ Փ.",
+    "ԿՈՄԻՏԱՍԻ ՊՈՂ.",
+    "NORK 17 ST. 1 LANE",
+    "ШОЛОХОВ УЛ.",
+    "",
+]
+HOUSE_NUMBERS = [
+    "5",
+    "17А",
+    "6,8,10",
+    "85/1",
+    "7 Բ",
+    "5-6",
+    "Հ.2",
+    "80,25",
+    "12\\3",
+    "Բ",
+    "1-ին",
+    "N5",
+    "",
+]
+
+
+def generate_addresses(count=5000, seed=42):
+    rng = random.Random(seed)
+    addresses = []
+    for _ in range(count):
+        area = rng.choice(AREAS)
+        district = rng.choice(DISTRICTS)
+        house_numbers = rng.choice(HOUSE_NUMBERS)
+        shape = rng.random()
+        if shape < 0.05:
+            addresses.append(area)
+        elif shape < 0.1:
+            addresses.append(f"{area},{district},{house_numbers}")
+        else:
+            separator = rng.choice([" ", "  ", "\t"]) if shape < 0.15 else " "
+            right_part = separator.join(p for p in (district, house_numbers) if p)
+            addresses.append(f"{area}, {right_part}")
+    return addresses
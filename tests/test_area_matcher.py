@@ -0,0 +1,36 @@
+import pytest
+from unittest.mock import AsyncMock
+from area_matcher import AhoCorasick, AreaMatch, AreaMatcher
+from area_registry import AreaRecord, AreaRegistry
+from models import Language
+
+
+def test_aho_corasick_reports_overlapping_matches():
+    automaton = AhoCorasick()
+    for pattern in ("HE", "SHE", "HIS", "HERS"):
+        automaton.add(pattern, pattern)
+
+    matches = sorted(automaton.search("USHERS"))
+
+    assert matches == [(1, 4, "SHE"), (2, 4, "HE"), (2, 6, "HERS")]
+
+
+@pytest.mark.asyncio
+async def test_area_matcher_prefers_longest_match_and_follows_registry():
+    registry = AreaRegistry()
+    registry._loaded = True
+    registry._add(AreaRecord(1, "Ереван", Language.RU))
+    registry._add(AreaRecord(2, "Абовян", Language.RU))
+    matcher = AreaMatcher(registry)
+    session = AsyncMock()
+    header = "Аварийное отключение в Абовяне и Нор Ереване"
+
+    best = await matcher.find_best(session, header, Language.RU)
+    assert best == AreaMatch(AreaRecord(2, "Абовян", Language.RU), 23, 29)
+
+    registry._add(AreaRecord(3, "Нор Ереван", Language.RU))
+    matches = await matcher.find_all(session, header, Language.RU)
+
+    assert [match.area.id for match in matches] == [2, 3, 1]
+    assert (await matcher.find_best(session, header, Language.RU)).area.id == 3
+    assert await matcher.find_best(session, header, Language.EN) is None
@@ -0,0 +1,43 @@
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+from area_registry import AreaRecord, AreaRegistry
+from models import Language
+
+
+def result_with(rows):
+    result = MagicMock()
+    result.all.return_value = rows
+    result.one.return_value = rows[0]
+    return result
+
+
+@pytest.mark.asyncio
+@patch("area_registry.event", MagicMock())
+async def test_area_registry_loads_once_and_upserts_missing_areas():
+    registry = AreaRegistry()
+    session = AsyncMock()
+    session.begin_nested = MagicMock(return_value=AsyncMock())
+    session.execute.side_effect = [
+        result_with([(1, "Abovyan", Language.EN), (2, "Абовян", Language.RU)]),
+        result_with([(3, "Charentsavan", Language.EN)]),
+    ]
+
+    assert await registry.get(session, "Abovyan", Language.EN) == AreaRecord(
+        1, "Abovyan", Language.EN
+    )
+    assert await registry.get(session, "Абовян", Language.RU) == AreaRecord(
+        2, "Абовян", Language.RU
+    )
+    created = await registry.get_or_create(session, "Charentsavan", Language.EN)
+
+    assert created == AreaRecord(3, "Charentsavan", Language.EN)
+    assert await registry.get_or_create(session, "Charentsavan", Language.EN) == created
+    assert session.execute.await_count == 2
+    session.commit.assert_not_awaited()
+    session.begin_nested.assert_called_once()
+    assert [
+        area.name for area in await registry.areas_for_language(session, Language.EN)
+    ] == [
+        "Abovyan",
+        "Charentsavan",
+    ]
@@ -1,7 +1,10 @@
 import pytest
 from unittest.mock import AsyncMock, patch
 from telegram import User
+from telegram.error import BadRequest
 from bot import error_handler, set_commands
+from config import MAX_POST_EDIT_ATTEMPTS
+from tasks import edit_post_in_channel
 
 
 @pytest.mark.asyncio
@@ -54,3 +57,29 @@ async def test_set_commands():
 
     # Ensure that commands are set up
     assert mock_application.bot.set_my_commands.called
+
+
+@pytest.mark.asyncio
+async def test_edit_post_in_channel_gives_up_after_repeated_failures():
+    post = AsyncMock(
+        id=1,
+        message_id=10,
+        text="✅ *Power restored!*",
+        edited_time=None,
+        edit_attempts=MAX_POST_EDIT_ATTEMPTS - 2,
+    )
+    context = AsyncMock()
+    context.bot.edit_message_text.side_effect = BadRequest(
+        "Can't parse entities: character '!' is reserved"
+    )
+    session = AsyncMock()
+
+    with patch("tasks.get_channel_id", return_value=-100):
+        assert await edit_post_in_channel(context, post, session) is True
+        assert post.edited_time is None
+        assert post.edit_attempts == MAX_POST_EDIT_ATTEMPTS - 1
+
+        assert await edit_post_in_channel(context, post, session) is True
+        assert post.edited_time is not None
+
+    assert session.commit.await_count == 2
@@ -1,16 +1,33 @@
+import json
 import pytest
 from datetime import datetime, timedelta
+from unittest.mock import AsyncMock, MagicMock, patch
 from models import Event, EventType, Language, Post, Area, post_event_association
-from post_handlers.emergency_power import generate_emergency_power_posts
+from message_packer import Section, telegram_length
+from post_handlers.emergency_power import (
+    coalesce_post_groups,
+    generate_emergency_power_posts,
+    mark_restored_power_posts,
+    with_heading,
+)
+from post_handlers.planned_power import generate_planned_power_post
+from parsers.water_parser import extract_water_announcement
 from post_handlers.water import generate_water_posts
-from utils import escape_markdown_v2, get_translation
+from utils import (
+    compute_hash_by_text,
+    escape_markdown_v2,
+    format_outage_time,
+    get_translation,
+    local_now,
+    split_house_numbers,
+)
 
 
 @pytest.mark.asyncio
 async def test_generate_emergency_power_posts(test_session):
     area_name = "Test Area"
-    start_time = (datetime.now() - timedelta(hours=1)).strftime("%d.%m.%Y %H:%M")
-    escaped_start_time = escape_markdown_v2(start_time)
+    start_time = (local_now() - timedelta(hours=1)).replace(second=0, microsecond=0)
+    escaped_start_time = escape_markdown_v2(format_outage_time(start_time))
     event_type = EventType.POWER
     language = Language.EN
 
@@ -24,12 +41,14 @@ async def test_generate_emergency_power_posts(test_session):
         area=area_name,
         district="Test District",
         house_number="1",
+        house_numbers=split_house_numbers("1")[0],
+        house_number_keys=split_house_numbers("1")[1],
         start_time=start_time,
         end_time=None,
         planned=False,
         processed=False,
         timestamp=datetime.now(),
-        hash="testhash1",
+        digest=compute_hash_by_text("testhash1"),
     )
 
     event2 = Event(
@@ -38,12 +57,14 @@ async def test_generate_emergency_power_posts(test_session):
         area=area_name,
         district="Test District",
         house_number="2,3",
+        house_numbers=split_house_numbers("2,3")[0],
+        house_number_keys=split_house_numbers("2,3")[1],
         start_time=start_time,
         end_time=None,
         planned=False,
         processed=False,
         timestamp=datetime.now(),
-        hash="testhash2",
+        digest=compute_hash_by_text("testhash2"),
     )
 
     event3 = Event(
@@ -52,12 +73,14 @@ async def test_generate_emergency_power_posts(test_session):
         area=area_name,
         district="Another District",
         house_number="4,5",
+        house_numbers=split_house_numbers("4,5")[0],
+        house_number_keys=split_house_numbers("4,5")[1],
         start_time=start_time,
         end_time=None,
         planned=False,
         processed=False,
         timestamp=datetime.now(),
-        hash="testhash3",
+        digest=compute_hash_by_text("testhash3"),
     )
 
     test_session.add_all([event1, event2, event3])
@@ -93,6 +116,93 @@ async def test_generate_emergency_power_posts(test_session):
     test_session.close()
 
 
+def test_coalesce_post_groups_merges_close_start_times():
+    start = local_now().replace(second=0, microsecond=0)
+    rows = [
+        ("Area", start, Language.EN, ["a"]),
+        ("Area", start + timedelta(minutes=10), Language.EN, ["b"]),
+        ("Area", start + timedelta(minutes=20), Language.EN, ["c"]),
+        ("Area", start, Language.RU, ["d"]),
+        ("Other", start + timedelta(minutes=5), Language.EN, ["e"]),
+    ]
+
+    clusters = coalesce_post_groups(rows, timedelta(minutes=15))
+
+    assert [(c.area, c.language, len(c.outages)) for c in clusters] == [
+        ("Area", Language.EN, 2),
+        ("Area", Language.EN, 1),
+        ("Area", Language.RU, 1),
+        ("Other", Language.EN, 1),
+    ]
+    assert clusters[0].outages[1] == (start + timedelta(minutes=10), ["b"])
+
+
+def test_with_heading_repeats_heading_in_each_section():
+    sections = [Section("x" * 10, [1]), Section("y" * 10, [2]), Section("z" * 10, [3])]
+
+    grouped = with_heading("*10:00*\n", sections, capacity=27)
+
+    assert [section.event_ids for section in grouped] == [[1, 2], [3]]
+    assert all(section.text.startswith("*10:00*\n") for section in grouped)
+    assert all(telegram_length(section.text) <= 27 for section in grouped)
+
+
+def test_with_heading_splits_sections_longer_than_capacity():
+    sections = [Section("x" * 30 + "\n", [1]), Section("y" * 5, [2])]
+
+    grouped = with_heading("*10:00*\n", sections, capacity=27)
+
+    assert [section.event_ids for section in grouped] == [[1], [1, 2]]
+    assert all(section.text.startswith("*10:00*\n") for section in grouped)
+    assert all(telegram_length(section.text) <= 27 for section in grouped)
+
+
+@pytest.mark.asyncio
+async def test_mark_restored_power_posts_skips_posts_without_message_id():
+    session = AsyncMock()
+    session.execute.return_value = MagicMock()
+    session.execute.return_value.scalars.return_value.all.return_value = []
+
+    await mark_restored_power_posts(session)
+
+    query = str(session.execute.await_args.args[0])
+    assert "posts.message_id IS NOT NULL OR posts.posted_time IS NULL" in query
+    session.commit.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_generate_planned_power_post_saves_posts_in_one_batch():
+    parsed_event = json.dumps(
+        [
+            {
+                "language": language,
+                "area": "Yerevan",
+                "start_time": "22.08.2024 10:00",
+                "end_time": "22.08.2024 16:00",
+                "text": "Frunze St.",
+            }
+            for language in ("EN", "XX", "RU")
+        ]
+    )
+    session = AsyncMock()
+
+    with patch(
+        "post_handlers.planned_power.get_or_create_area", AsyncMock(return_value=None)
+    ), patch.dict(
+        "post_handlers.planned_power.translations",
+        {language.name: str for language in Language},
+    ), patch(
+        "post_handlers.planned_power.save_posts_to_db"
+    ) as save_posts:
+        await generate_planned_power_post(session, parsed_event, 7)
+
+    pending_posts = save_posts.await_args.args[1]
+    assert [post.language for post in pending_posts] == [Language.EN, Language.RU]
+    assert all(post.event_ids == [7] for post in pending_posts)
+    session.commit.assert_awaited_once()
+    session.rollback.assert_not_awaited()
+
+
 @pytest.mark.asyncio
 async def test_generate_water_posts(test_session):
     areas = {
@@ -105,8 +215,9 @@ async def test_generate_water_posts(test_session):
         test_session.add(test_area)
         test_session.commit()
 
+    heading_hy = "Վթարային ջրանջատում Կոտայքի մարզի Աբովյան քաղաքում օգոստոսի 31-ին"
     event_text_hy = (
-        "Վթարային ջրանջատում Կոտայքի մարզի Աբովյան քաղաքում օգոստոսի 31-ին "
+        f"{heading_hy}\n\n"
         "«Վեոլիա Ջուր» ընկերությունը տեղեկացնում է իր հաճախորդներին և սպառողներին, "
         "որ վթարային աշխատանքներով պայմանավորված, ս.թ. օգոստոսի 31-ին ժամը 13:00-17:00-ն "
         "կդադարեցվի Աբովյան քաղաքի 3,4,5,6,7,8 Մ/շ-ների, Սեվանի, Հանրապետության Պող. "
@@ -115,15 +226,20 @@ async def test_generate_water_posts(test_session):
     )
     language = Language.HY
     translations = get_translation()
+    announcement = extract_water_announcement(heading_hy, event_text_hy)
 
     test_event = Event(
         event_type=EventType.WATER,
         language=language,
+        area=areas[Language.HY],
+        district="\n".join(announcement.streets),
+        start_time=announcement.start_time,
+        end_time=announcement.end_time,
         text=event_text_hy,
-        planned=False,
+        planned=announcement.planned,
         processed=False,
         timestamp=datetime.now(),
-        hash="testhash_water",
+        digest=compute_hash_by_text("testhash_water"),
     )
 
     test_session.add(test_event)
@@ -0,0 +1,43 @@
+import pytest
+from message_packer import Section, pack_sections, telegram_length
+
+
+def test_telegram_length_counts_utf16_units_after_entity_parsing():
+    assert telegram_length("*Bold* 1\\.5") == 8
+    assert telegram_length("⚡️") == 2
+    assert telegram_length("💧") == 2
+
+
+def test_pack_sections_uses_fewest_messages():
+    sections = [
+        Section("a" * 60, [1]),
+        Section("b" * 50, [2]),
+        Section("c" * 40, [3]),
+        Section("d" * 40, [4]),
+        Section("e" * 10, [5]),
+    ]
+
+    chunks = pack_sections("*H*\n", sections, limit=102)
+
+    assert len(chunks) == 2
+    assert all(chunk.text.startswith("*H*\n") for chunk in chunks)
+    assert all(telegram_length(chunk.text) <= 102 for chunk in chunks)
+    assert sorted(i for chunk in chunks for i in chunk.event_ids) == [1, 2, 3, 4, 5]
+    assert chunks[0].event_ids == [1, 3]
+    assert chunks[1].event_ids == [2, 4, 5]
+
+
+def test_pack_sections_splits_oversized_section_at_lines():
+    text = "".join(f"line {i}\\.\n" for i in range(10))
+
+    chunks = pack_sections("H\n", [Section(text, [7])], limit=30)
+
+    assert len(chunks) > 1
+    assert all(chunk.event_ids == [7] for chunk in chunks)
+    assert all(telegram_length(chunk.text) <= 30 for chunk in chunks)
+    assert "".join(chunk.text[2:] for chunk in chunks) == text
+
+
+def test_pack_sections_rejects_header_over_limit():
+    with pytest.raises(ValueError):
+        pack_sections("x" * 20, [Section("y", [1])], limit=10)
@@ -0,0 +1,168 @@
+"""
+Differential tests of the normalization module against the previous implementations.
+"""
+
+from enum import Enum
+import random
+import re
+import unicodedata
+import pytest
+from models import EventType, Language
+from normalization import (
+    detect_language_by_charset,
+    escape_markdown_v2,
+    normalize_text,
+    normalize_value,
+)
+
+
+def reference_normalize_text(value):
+    # Handle None input
+    if value is None:
+        return ""
+
+    # Convert Enums to their name representation or ensure the value is a string
+    if isinstance(value, Enum):
+        value = value.name.upper()
+    else:
+        value = str(value).strip().upper()
+
+    # Apply Unicode normalization to the string
+    value = unicodedata.normalize("NFC", value)
+    value = re.sub(r"\s+", " ", value)  # Replace multiple spaces with a single space
+
+    return value
+
+
+def reference_normalize_value(value):
+    # Normalize the value
+    value = reference_normalize_text(value)
+
+    # Apply corrections specific to translation
+    corrections = {
+        "ШАРК": "РЯД",
+        "SHARQ": "ROW",
+        "МИКРОШРДЖАН": "МИКРОРАЙОН",
+        "MIKROSHRDJAN": "MICRODISTRICT",
+    }
+
+    if isinstance(value, str):
+        for wrong, correct in corrections.items():
+            if wrong in value:
+                value = value.replace(wrong, correct)
+
+    return value
+
+
+def reference_escape_markdown_v2(text):
+    # Replace all dash variants with a regular hyphen
+    text = text.replace("—", "-")  # em-dash
+    text = text.replace("–", "-")  # en-dash
+    text = text.replace("−", "-")  # minus sign (not a hyphen)
+
+    special_characters = [
+        "_",
+        "*",
+        "[",
+        "]",
+        "(",
+        ")",
+        "~",
+        "`",
+        ">",
+        "#",
+        "+",
+        "-",
+        "=",
+        "|",
+        "{",
+        "}",
+        ".",
+        "!",
+    ]
+
+    # Replace non-breaking spaces with regular spaces
+    text = text.replace("\u00A0", " ")
+
+    # Escape all special characters
+    escaped_text = text
+    for char in special_characters:
+        escaped_text = escaped_text.replace(char, f"\\{char}")
+
+    return escaped_text
+
+
+def reference_detect_language_by_charset(text):
+
+    cyrillic_chars = set(
+        "АБВГДЕЁЖЗИЙКЛМНОПРСТУФХЦЧШЩЪЫЬЭЮЯабвгдеёжзийклмнопрстуфхцчшщъыьэюя"
+    )
+    armenian_chars = set(
+        "ԱԲԳԴԵԶԷԸԹԺԻԼԽԾԿՀՁՂՃՄՅՆՇՈՉՊՋՌՍՎՏՐՑՒՓՔՕՖաաբգդեզէըթժիլխծկհձղճմյնշոչպջռսվտրցւփքօֆ"
+    )
+
+    text_chars = set(text.replace(" ", ""))
+
+    if text_chars & armenian_chars:
+        return Language.HY
+    elif text_chars & cyrillic_chars:
+        return Language.RU
+    elif any("a" <= c <= "z" or "A" <= c <= "Z" for c in text):
+        return Language.EN
+    else:
+        return None
+
+
+def generate_inputs(count=3000, seed=13):
+    rng = random.Random(seed)
+    alphabet = (
+        "ԱԲԳԴԵՓՈՂՈՑաբգդեւֆ"
+        "АБВГДЕЁЖШАРКМИКРОШРДЖАНабвгдеёжюя"
+        "ABCSHARQMIKROSHRDJANabcxyz"
+        "0123456789 _*[]()~`>#+-=|{}.!,/\\"
+        "\t\n\r\u00a0\u2003\x1c—–−ﬁǅ\u0301"
+    )
+    samples = [
+        "ШАРК МИКРОШРДЖАН",
+        "  sharq  mikroshrdjan ",
+        "7 Բ",
+        "Ա\u0301",
+        "",
+    ]
+    for _ in range(count):
+        length = rng.randint(0, 30)
+        samples.append("".join(rng.choice(alphabet) for _ in range(length)))
+    return samples
+
+
+INPUTS = generate_inputs()
+
+
+@pytest.mark.parametrize("value", [None, Language.HY, EventType.POWER, 12, False])
+def test_normalize_text_non_string_inputs(value):
+    assert normalize_text(value) == reference_normalize_text(value)
+    assert normalize_value(value) == reference_normalize_value(value)
+
+
+def test_normalize_text_matches_reference():
+    for value in INPUTS:
+        assert normalize_text(value) == reference_normalize_text(value), repr(value)
+
+
+def test_normalize_value_matches_reference():
+    for value in INPUTS:
+        assert normalize_value(value) == reference_normalize_value(value), repr(value)
+
+
+def test_detect_language_by_charset_matches_reference():
+    for value in INPUTS:
+        assert detect_language_by_charset(value) == reference_detect_language_by_charset(
+            value
+        ), repr(value)
+
+
+def test_escape_markdown_v2_matches_reference():
+    for value in INPUTS:
+        assert escape_markdown_v2(value) == reference_escape_markdown_v2(value), repr(
+            value
+        )
@@ -0,0 +1,18 @@
+from models import Event, EventType
+from notifications.notification_handlers import matches_keyword
+
+
+def test_matches_keyword_searches_water_text_beyond_extracted_streets():
+    water_event = Event(
+        event_type=EventType.WATER,
+        district="Սեվանի\nՀանրապետության Պող.",
+        text="Աբովյան քաղաքի Սեվանի, Հանրապետության Պող. ջրամատակարարումը",
+    )
+    power_event = Event(
+        event_type=EventType.POWER, district="Kentron", text="Abovyan St. Kentron"
+    )
+
+    assert matches_keyword(water_event, "սեվանի")
+    assert matches_keyword(water_event, "Աբովյան")
+    assert matches_keyword(power_event, "kentron")
+    assert not matches_keyword(power_event, "Abovyan")
@@ -0,0 +1,55 @@
+from datetime import datetime
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+from models import Language, PostType
+from orm import PendingPost, bulk_insert_events, save_posts_to_db
+
+
+@pytest.mark.asyncio
+async def test_save_posts_to_db_uses_three_statements_for_many_posts():
+    pending_posts = [
+        PendingPost(
+            PostType.EMERGENCY_POWER, f"Post {i}", [i, i + 1], Language.EN, None
+        )
+        for i in range(200)
+    ]
+    timestamp = datetime(2024, 8, 31, 12, 0)
+
+    post_ids = MagicMock()
+    post_ids.scalars.return_value.all.return_value = list(range(1000, 1200))
+    event_timestamps = MagicMock()
+    event_timestamps.all.return_value = [(i, timestamp) for i in range(201)]
+    session = AsyncMock()
+    session.execute.side_effect = [post_ids, event_timestamps, MagicMock()]
+
+    assert await save_posts_to_db(session, pending_posts) == list(range(1000, 1200))
+
+    assert session.execute.await_count == 3
+    session.commit.assert_not_awaited()
+    links = session.execute.await_args_list[2].args[1]
+    assert len(links) == 400
+    assert links[0] == {"post_id": 1000, "event_id": 0, "event_timestamp": timestamp}
+
+
+@pytest.mark.asyncio
+async def test_bulk_insert_events_inserts_only_claimed_digests():
+    events = [{"digest": bytes([i]) * 16, "text": f"Event {i}"} for i in range(3)]
+    events.append(dict(events[0]))
+
+    known = MagicMock()
+    known.scalars.return_value.all.return_value = [events[1]["digest"]]
+    claimed = MagicMock()
+    # Another ingest claimed the third digest first
+    claimed.scalars.return_value.all.return_value = [events[0]["digest"]]
+    inserted = MagicMock()
+    inserted.scalars.return_value.all.return_value = [42]
+    session = AsyncMock()
+    session.execute.side_effect = [known, claimed, inserted]
+
+    assert await bulk_insert_events(session, events) == [42]
+
+    statement = session.execute.await_args_list[2].args[0]
+    params = statement.compile().params
+    assert [value for key, value in params.items() if key.startswith("text")] == [
+        "Event 0"
+    ]
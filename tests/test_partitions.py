@@ -0,0 +1,67 @@
+from datetime import date
+import pytest
+from unittest.mock import AsyncMock, patch
+from partitions import (
+    create_partitions,
+    drop_expired_partitions,
+    partition_day,
+    partition_ddl,
+    partition_name,
+)
+
+
+def test_partition_name_round_trip():
+    day = date(2024, 8, 31)
+
+    assert partition_name("events", day) == "events_p20240831"
+    assert partition_day(partition_name("events", day)) == day
+    assert partition_day("events_default") is None
+    assert partition_ddl("events", day).endswith(
+        "FOR VALUES FROM ('2024-08-31') TO ('2024-09-01')"
+    )
+
+
+@pytest.mark.asyncio
+async def test_drop_expired_partitions_drops_association_first():
+    partitions = {
+        "post_event_association": [
+            "post_event_association_default",
+            "post_event_association_p20240829",
+            "post_event_association_p20240901",
+        ],
+        "events": ["events_default", "events_p20240829", "events_p20240901"],
+    }
+    session = AsyncMock()
+
+    with patch(
+        "partitions.list_partitions",
+        AsyncMock(side_effect=lambda session, table: partitions[table]),
+    ):
+        dropped = await drop_expired_partitions(session, date(2024, 9, 1))
+
+    assert dropped == ["post_event_association_p20240829", "events_p20240829"]
+    statements = [str(call.args[0]) for call in session.execute.await_args_list]
+    assert statements == [
+        "DELETE FROM post_event_association_default WHERE event_timestamp < :day",
+        "ALTER TABLE post_event_association DETACH PARTITION "
+        "post_event_association_p20240829",
+        "DROP TABLE post_event_association_p20240829",
+        'DELETE FROM events_default WHERE "timestamp" < :day',
+        "ALTER TABLE events DETACH PARTITION events_p20240829",
+        "DROP TABLE events_p20240829",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_create_partitions_skips_days_in_default_partition():
+    session = AsyncMock()
+
+    with patch(
+        "partitions.default_partition_days",
+        AsyncMock(side_effect=lambda session, table: {date(2024, 9, 1)}),
+    ):
+        await create_partitions(session, date(2024, 8, 31), date(2024, 9, 2))
+
+    statements = [str(call.args[0]) for call in session.execute.await_args_list]
+    assert not any("p20240901" in statement for statement in statements)
+    assert sum("events_p" in statement for statement in statements) == 2
@@ -1,5 +1,55 @@
+import re
 import pytest
 from parsers.power_parser import split_address
+from tests.address_corpus import generate_addresses
+
+
+def reference_split_address(address):
+    """The original regex cascade, kept to check the single-pass splitter against it."""
+    parts = address.split(",")
+    if len(parts) == 1:
+        return parts[0].strip(), None, None
+
+    area = parts[0].strip()
+    right_part = ",".join(parts[1:]).strip()
+
+    house_number_pattern = r"^[\dA-ZА-Яа-ֆ/\\\-.,]*\d+[\dA-ZА-Яа-ֆ/\\\-.,]*$"
+    number_letter_pattern = r"^\d+ [Ա-Ֆա-ֆ]$"
+
+    if re.match(number_letter_pattern, right_part):
+        return area, None, right_part
+
+    if re.match(house_number_pattern, right_part) and not (
+        " " in right_part and not re.match(number_letter_pattern, right_part)
+    ):
+        return area, None, right_part
+
+    last_space_index = right_part.rfind(" ")
+
+    if last_space_index != -1:
+        potential_house_number = right_part[last_space_index + 1 :].strip()
+        district = right_part[:last_space_index].strip()
+
+        if re.match(house_number_pattern, potential_house_number):
+            if " " in potential_house_number and not re.match(
+                number_letter_pattern, potential_house_number
+            ):
+                pass
+            else:
+                return area, district, potential_house_number
+
+        second_last_space_index = right_part[:last_space_index].rfind(" ")
+        if second_last_space_index != -1:
+            potential_house_number = right_part[second_last_space_index + 1 :].strip()
+            district = right_part[:second_last_space_index].strip()
+            if re.match(number_letter_pattern, potential_house_number):
+                return area, district, potential_house_number
+            else:
+                return area, right_part, None
+        else:
+            return area, right_part, None
+    else:
+        return area, right_part, None
 
 
 @pytest.mark.parametrize(
@@ -46,3 +96,15 @@ def test_split_address(
     assert area.upper() == expected_area.upper()
     assert district == expected_district
     assert house_number == expected_house_number
+
+
+def test_split_address_matches_reference_on_generated_corpus():
+    for address in generate_addresses():
+        assert tuple(split_address(address)) == reference_split_address(address), address
+
+
+def test_split_address_returns_typed_record():
+    address = split_address("г.ЕРЕВАН, ШОЛОХОВ УЛ. 7 Բ")
+    assert address.area == "г.ЕРЕВАН"
+    assert address.district == "ШОЛОХОВ УЛ."
+    assert address.house_numbers == "7 Բ"
@@ -0,0 +1,43 @@
+import os
+from benchmarks.bench_power_table import reference_extract_table_rows
+from parsers.power_parser import OUTAGE_TABLE_ID, OutageRow, extract_table_rows
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), "data")
+
+
+def load_page(name):
+    with open(os.path.join(DATA_DIR, name), encoding="utf-8") as f:
+        return f.read()
+
+
+def test_extract_table_rows_matches_reference():
+    html = load_page("ena_emergency_ru.html")
+
+    expected = reference_extract_table_rows(html)
+    rows = extract_table_rows(html)
+
+    assert len(rows) == 180
+    assert [list(row) for row in rows] == expected
+    assert all(isinstance(row, OutageRow) for row in rows)
+
+
+def test_extract_table_rows_skips_malformed_rows():
+    html = (
+        f'<table id="{OUTAGE_TABLE_ID}"><tbody>'
+        "<tr><td>15.10.2026 10:00</td><td>г.ЕРЕВАН, 5</td></tr>"
+        "<tr><td>15.10.2026 11:00</td></tr>"
+        "</tbody></table>"
+    )
+
+    assert extract_table_rows(html) == [
+        OutageRow(start_time="15.10.2026 10:00", address="г.ЕРЕВАН, 5")
+    ]
+
+
+def test_extract_table_rows_without_table():
+    assert extract_table_rows("<html><body><p>Maintenance</p></body></html>") == []
+
+
+def test_extract_table_rows_with_empty_page():
+    assert extract_table_rows("") == []
+    assert extract_table_rows(" \n\t") == []
@@ -0,0 +1,105 @@
+from datetime import datetime, timedelta
+import re
+import pytest
+from sqlalchemy import func, text
+from action_handlers.subscribe_handlers import areas_by_first_letter_query
+from models import Area, Event, EventType, Language, Post, PostType
+from post_handlers.emergency_power import emergency_power_groups_query
+from post_handlers.water import unprocessed_water_events_query
+from tasks import (
+    restored_power_posts_query,
+    unsent_power_posts_query,
+    unsent_water_posts_query,
+)
+from utils import compute_hash_by_text, local_now
+
+# The polling queries of tasks.py, post_handlers and subscribe_handlers, with the
+# index each of them is expected to use
+POLLING_QUERIES = {
+    "unsent power posts": (unsent_power_posts_query(), "idx_posts_unsent"),
+    "restored power posts": (
+        restored_power_posts_query(),
+        "idx_posts_restored_unedited",
+    ),
+    "unsent water posts": (unsent_water_posts_query(), "idx_posts_unsent"),
+    "unprocessed power events": (
+        emergency_power_groups_query(local_now() - timedelta(hours=24)),
+        "idx_events_unprocessed",
+    ),
+    "unprocessed water events": (
+        unprocessed_water_events_query(),
+        "idx_events_unprocessed",
+    ),
+    "areas by first letter": (
+        areas_by_first_letter_query(Language.RU, "А"),
+        "idx_areas_language_name_prefix",
+    ),
+}
+
+
+def seed(session):
+    now = datetime.now()
+    for i in range(50):
+        session.add(Area(name=f"Район {i}", language=Language.RU))
+        session.add(
+            Event(
+                event_type=EventType.POWER if i % 2 else EventType.WATER,
+                language=Language.HY,
+                area=f"Район {i}",
+                start_time=local_now(),
+                text=f"Event {i}",
+                planned=False,
+                processed=i % 3 == 0,
+                timestamp=now,
+                digest=compute_hash_by_text(f"plan {i}"),
+            )
+        )
+        session.add(
+            Post(
+                language=Language.RU,
+                post_type=PostType.EMERGENCY_POWER,
+                text=f"Post {i}",
+                creation_time=now,
+                posted_time=now if i % 2 else None,
+            )
+        )
+    session.commit()
+
+
+def index_names(session, index):
+    """
+    Returns the name of `index` and of the indexes of its partitions.
+    """
+    result = session.execute(
+        text(
+            "SELECT child.relname FROM pg_inherits "
+            "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+            "WHERE pg_inherits.inhparent = CAST(:index AS regclass)"
+        ),
+        {"index": index},
+    )
+    return {index, *result.scalars().all()}
+
+
+def explain(session, statement):
+    compiled = statement.compile(
+        dialect=session.bind.dialect, compile_kwargs={"literal_binds": True}
+    )
+    result = session.connection().exec_driver_sql(f"EXPLAIN {compiled}")
+    return "\n".join(row[0] for row in result)
+
+
+@pytest.mark.parametrize("name", POLLING_QUERIES)
+def test_polling_queries_use_indexes(test_session, name):
+    seed(test_session)
+    # Seeded tables are tiny, so sequential scans are only allowed as a last resort
+    test_session.execute(func.set_config("enable_seqscan", "off", True).select())
+
+    statement, index = POLLING_QUERIES[name]
+    plan = explain(test_session, statement)
+
+    assert "Seq Scan" not in plan, plan
+    assert any(
+        re.search(rf"\b(using|on) {re.escape(index_name)}\b", plan)
+        for index_name in index_names(test_session, index)
+    ), plan
@@ -0,0 +1,42 @@
+from types import SimpleNamespace
+from models import EventType, Language
+from parsers.snapshots import SnapshotStore, diff_rows
+
+
+def test_diff_rows_without_previous_snapshot():
+    rows = [("15.10.2026 10:00", "г.ЕРЕВАН, 5"), ("15.10.2026 11:00", "г.АБОВЯН")]
+
+    diff = diff_rows(None, rows)
+
+    assert diff.added == rows
+    assert diff.removed == []
+    assert diff.unchanged == 0
+
+
+def test_diff_rows_reports_added_and_removed():
+    previous = [("15.10.2026 10:00", "г.ЕРЕВАН, 5"), ("15.10.2026 11:00", "г.АБОВЯН")]
+    current = [["15.10.2026 11:00", "г.АБОВЯН"], ["15.10.2026 12:00", "г.ГЮМРИ, 7 Բ"]]
+
+    diff = diff_rows(previous, current)
+
+    assert diff.added == [("15.10.2026 12:00", "г.ГЮМРИ, 7 Բ")]
+    assert diff.removed == [("15.10.2026 10:00", "г.ЕРЕВАН, 5")]
+    assert diff.unchanged == 1
+
+
+def test_snapshot_store_loads_persisted_snapshot():
+    store = SnapshotStore()
+    state = SimpleNamespace(
+        source=EventType.POWER,
+        language=Language.RU,
+        snapshot=[["15.10.2026 10:00", "г.ЕРЕВАН, 5"]],
+    )
+
+    assert store.get(state) == [("15.10.2026 10:00", "г.ЕРЕВАН, 5")]
+
+    store.stage(state, [("15.10.2026 11:00", "г.АБОВЯН")])
+    assert state.snapshot == [["15.10.2026 11:00", "г.АБОВЯН"]]
+    assert store.get(state) == [("15.10.2026 10:00", "г.ЕРЕВАН, 5")]
+
+    store.remember(state, [("15.10.2026 11:00", "г.АБОВЯН")])
+    assert store.get(state) == [("15.10.2026 11:00", "г.АБОВЯН")]
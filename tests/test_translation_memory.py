@@ -0,0 +1,54 @@
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, patch
+from translation_memory import TranslationMemory, source_digest
+
+
+@pytest.mark.asyncio
+async def test_translation_memory_calls_translator_once_per_key():
+    memory = TranslationMemory(max_size=10)
+    translator = AsyncMock(return_value="Abovyan")
+
+    with patch.object(memory, "_load", AsyncMock(return_value=None)), patch.object(
+        memory, "_store", AsyncMock()
+    ):
+        results = await asyncio.gather(
+            memory.translate("Աբովյան", "hy", "en", translator),
+            memory.translate("Աբովյան ", "hy", "en", translator),
+        )
+        results.append(await memory.translate(" Աբովյան", "hy", "en", translator))
+
+    assert results == ["Abovyan"] * 3
+    translator.assert_awaited_once()
+    assert memory.stats["misses"] == 1
+    assert memory.stats["hits"] == 1
+
+
+@pytest.mark.asyncio
+async def test_translation_memory_uses_stored_translation():
+    memory = TranslationMemory(max_size=10)
+    translator = AsyncMock()
+
+    with patch.object(memory, "_load", AsyncMock(return_value="Абовян")):
+        assert await memory.translate("Աբովյան", "hy", "ru", translator) == "Абовян"
+
+    translator.assert_not_awaited()
+    assert memory.stats["db_hits"] == 1
+
+
+def test_translation_memory_evicts_least_recently_used():
+    memory = TranslationMemory(max_size=2)
+    memory._remember(("a", "hy", "en"), "A")
+    memory._remember(("b", "hy", "en"), "B")
+    assert memory.get_cached("a", "hy", "en") == "A"
+    memory._remember(("c", "hy", "en"), "C")
+
+    assert memory.get_cached("b", "hy", "en") is None
+    assert memory.get_cached("a", "hy", "en") == "A"
+
+
+def test_source_digest_has_fixed_size_for_long_texts():
+    long_text = "Վթարային ջրանջատում " * 500
+
+    assert len(source_digest(long_text)) == 16
+    assert source_digest(long_text) != source_digest(long_text + ".")
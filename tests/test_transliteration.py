@@ -0,0 +1,46 @@
+import pytest
+from transliteration import classify_token, common_words, localize_armenian, transliterate
+
+
+@pytest.mark.parametrize(
+    "text, target_language, expected",
+    [
+        ("ԵՐԵՎԱՆ", "en", "YEREVAN"),
+        ("ԵՐԵՎԱՆ", "ru", "ЕРЕВАН"),
+        ("ՆՈՒԲԱՐԱՇԵՆ", "en", "NUBARASHEN"),
+        ("ՆՈՒԲԱՐԱՇԵՆ", "ru", "НУБАРАШЕН"),
+        ("ՈՍԿԵՀԱՏ", "en", "VOSKEHAT"),
+        ("ՇՈՂԱԿԱԹ", "ru", "ШОХАКАТ"),
+        ("7 Բ", "en", "7 B"),
+        ("7 Բ", "ru", "7 Б"),
+        ("Հ.2", "en", "H.2"),
+        ("Աբովյան", "en", "Abovyan"),
+        ("ԱԲՈՎՅԱՆ", "ru", "АБОВЯН"),
+        ("ԳՅՈՒՄՐԻ", "ru", "ГЮМРИ"),
+        ("ԳՅՈՒՄՐԻ", "en", "GYUMRI"),
+        ("ՄԱՅԵՐ", "ru", "МАЕР"),
+        ("Երևան", "ru", "Ереван"),
+        ("Երևան", "en", "Yerevan"),
+    ],
+)
+def test_transliterate(text, target_language, expected):
+    assert transliterate(text, target_language) == expected
+
+
+def test_classify_token():
+    assert classify_token("ՓՈՂՈՑ") == "term"
+    assert classify_token("ԵՎ") == "word"
+    assert classify_token("ԱՌԱՆՁՆԱՏՆԵՐ") == "word"
+    assert classify_token("ԱԲՈՎՅԱՆ") == "name"
+    assert classify_token("Բ") == "name"
+
+
+def test_localize_armenian():
+    assert (
+        localize_armenian("ԱԲՈՎՅԱՆ ՓՈՂՈՑ 7 Բ", "ru") == "АБОВЯН УЛИЦА 7 Б"
+    )
+    assert (
+        localize_armenian("ԱՌԱՆՁՆԱՏՆԵՐ ԵՎ ՇԵՆՔ", "en", {"ԵՎ": "AND"})
+        == "ARANDZNATNER AND BUILDING"
+    )
+    assert common_words("ԱՌԱՆՁՆԱՏՆԵՐ ԵՎ ՇԵՆՔ Բ") == ["ԱՌԱՆՁՆԱՏՆԵՐ", "ԵՎ"]
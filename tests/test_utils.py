@@ -0,0 +1,121 @@
+import asyncio
+from datetime import timedelta, timezone
+import pytest
+from config import TRANSLATION_TIMEOUT
+from unittest.mock import AsyncMock, MagicMock, patch
+from utils import (
+    TranslationUnavailableError,
+    compute_hash,
+    format_outage_time,
+    parse_outage_time,
+    request_google_translation,
+    split_house_numbers,
+    translate_values,
+)
+
+
+@pytest.mark.asyncio
+async def test_translate_values_requests_each_common_word_once():
+    words = {"ԱՌԱՆՁՆԱՏՆԵՐ": "частные дома", "ԵՎ": "и"}
+    lingva = AsyncMock(side_effect=lambda text, source, target, translator: words[text])
+
+    with patch("utils.translation_memory.translate", lingva):
+        translations = await translate_values(
+            [
+                "ԿԵՆՏՐՈՆ",
+                "7 Բ",
+                "БАШИНДЖАГЯН УЛ.",
+                "",
+                "ԱՌԱՆՁՆԱՏՆԵՐ",
+                "ԱՌԱՆՁՆԱՏՆԵՐ ԵՎ ՇԵՆՔ",
+            ],
+            "ru",
+        )
+
+    assert translations == {
+        "ԿԵՆՏՐՈՆ": "КЕНТРОН",
+        "7 Բ": "7 Б",
+        "ԱՌԱՆՁՆԱՏՆԵՐ": "ЧАСТНЫЕ ДОМА",
+        "ԱՌԱՆՁՆԱՏՆԵՐ ԵՎ ՇԵՆՔ": "ЧАСТНЫЕ ДОМА И ЗДАНИЕ",
+    }
+    assert lingva.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_translate_values_skips_armenian_target():
+    lingva = AsyncMock()
+
+    with patch("utils.translation_memory.translate", lingva):
+        assert await translate_values(["ԿԵՆՏՐՈՆ"], "hy") == {}
+
+    lingva.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_translate_values_raises_when_a_word_fails():
+    lingva = AsyncMock(side_effect=asyncio.TimeoutError())
+
+    with patch("utils.translation_memory.translate", lingva):
+        with pytest.raises(TranslationUnavailableError):
+            await translate_values(["ԱՌԱՆՁՆԱՏՆԵՐ"], "ru")
+
+
+def test_compute_hash_frames_fields():
+    assert compute_hash("AB", "C") != compute_hash("A", "BC")
+    assert compute_hash("a b", None) == compute_hash(" A  B ", "")
+    assert len(compute_hash("A", "B")) == 16
+
+
+def test_outage_time_round_trip():
+    outage_time = parse_outage_time("22.08.2024 10:00")
+
+    assert outage_time.utcoffset() == timedelta(hours=4)
+    assert format_outage_time(outage_time) == "22.08.2024 10:00"
+    assert (
+        format_outage_time(outage_time.astimezone(timezone.utc)) == "22.08.2024 10:00"
+    )
+    assert parse_outage_time("22.08.2024") is None
+
+
+def test_split_house_numbers_dedupes_in_natural_order():
+    numbers, keys = split_house_numbers("10, 2/1, 2, 1Ա,10, 9")
+
+    assert numbers == ["1Ա", "2", "2/1", "9", "10"]
+    assert keys == sorted(keys)
+    assert split_house_numbers(None) == ([], [])
+
+
+def google_session(status, html):
+    response = MagicMock(status=status)
+    response.text = AsyncMock(return_value=html)
+    session = MagicMock()
+    session.get.return_value.__aenter__ = AsyncMock(return_value=response)
+    session.get.return_value.__aexit__ = AsyncMock(return_value=False)
+    return session
+
+
+@pytest.mark.asyncio
+async def test_request_google_translation_reads_the_mobile_page():
+    session = google_session(200, '<div class="result-container"> Abovyan </div>')
+
+    with patch("utils.get_http_session", return_value=session):
+        assert await request_google_translation("Աբովյան", "auto", "en") == "Abovyan"
+
+    assert session.get.call_args.kwargs["params"] == {
+        "sl": "auto",
+        "tl": "en",
+        "q": "Աբովյան",
+    }
+    assert session.get.call_args.kwargs["timeout"].total == TRANSLATION_TIMEOUT
+
+
+@pytest.mark.asyncio
+async def test_request_google_translation_raises_without_a_translation():
+    with patch("utils.get_http_session", return_value=google_session(429, "")):
+        with pytest.raises(RuntimeError, match="status 429"):
+            await request_google_translation("Աբովյան", "auto", "en")
+
+    session = google_session(200, "<html><body>Unexpected page</body></html>")
+    with patch("utils.get_http_session", return_value=session):
+        with pytest.raises(RuntimeError, match="No translation found"):
+            await request_google_translation("Աբովյան", "auto", "en")
@@ -0,0 +1,110 @@
+from datetime import date, datetime
+from types import SimpleNamespace
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+from parsers.water_parser import (
+    extract_outage_window,
+    extract_water_announcement,
+    is_outdated,
+    parse_water_events,
+)
+from utils import LOCAL_TIMEZONE, compute_hash_by_text
+
+HEADING = "Վթարային ջրանջատում Կոտայքի մարզի Աբովյան քաղաքում օգոստոսի 31-ին"
+TEXT = (
+    f"{HEADING}\n\n"
+    "«Վեոլիա Ջուր» ընկերությունը տեղեկացնում է իր հաճախորդներին և սպառողներին, "
+    "որ վթարային աշխատանքներով պայմանավորված, ս.թ. օգոստոսի 31-ին ժամը 13:00-17:00-ն "
+    "կդադարեցվի Աբովյան քաղաքի 3,4,5,6,7,8 Մ/շ-ների, Սեվանի, Հանրապետության Պող. "
+    "ջրամատակարարումը: Ընկերությունը հայցում է սպառողների ներողամտությունը պատճառված "
+    "անհանգստության և կանխավ շնորհակալություն հայտնում ըմբռնման համար: 30.08.2024թ."
+)
+
+
+def test_extract_water_announcement():
+    announcement = extract_water_announcement(HEADING, TEXT)
+
+    assert announcement.streets == [
+        "3,4,5,6,7,8 Մ/շ-ների",
+        "Սեվանի",
+        "Հանրապետության Պող.",
+    ]
+    assert announcement.start_time == datetime(2024, 8, 31, 13, tzinfo=LOCAL_TIMEZONE)
+    assert announcement.end_time == datetime(2024, 8, 31, 17, tzinfo=LOCAL_TIMEZONE)
+    assert announcement.publication_date == date(2024, 8, 30)
+    assert not announcement.planned
+    assert extract_water_announcement(f"Պլանային {HEADING}", TEXT).planned
+
+
+def test_extract_outage_window_handles_overnight_and_new_year():
+    start_time, end_time = extract_outage_window(
+        "հունվարի 2-ին ժամը 23:00-05:00", date(2024, 12, 30)
+    )
+
+    assert start_time == datetime(2025, 1, 2, 23, tzinfo=LOCAL_TIMEZONE)
+    assert end_time == datetime(2025, 1, 3, 5, tzinfo=LOCAL_TIMEZONE)
+    assert extract_outage_window("հունվարի 2-ին", date(2024, 12, 30)) == (None, None)
+
+
+def test_is_outdated_skips_ended_and_expired_planned_announcements():
+    planned = extract_water_announcement(f"Պլանային {HEADING}", TEXT)
+    before = datetime(2024, 8, 31, 12, tzinfo=LOCAL_TIMEZONE)
+    after = datetime(2024, 8, 31, 18, tzinfo=LOCAL_TIMEZONE)
+
+    with patch("parsers.water_parser.local_now", return_value=before):
+        assert not is_outdated(planned)
+    with patch("parsers.water_parser.local_now", return_value=after):
+        assert is_outdated(planned)
+
+    # Without an outage time a planned announcement is kept as long as its digest
+    untimed = planned._replace(start_time=None, end_time=None)
+    with patch("parsers.water_parser.datetime") as clock:
+        clock.now.return_value = datetime(2024, 9, 2)
+        assert not is_outdated(untimed)
+        clock.now.return_value = datetime(2024, 9, 30)
+        assert is_outdated(untimed)
+
+
+def water_page(*texts):
+    panels = "".join(
+        f'<div class="panel"><div class="panel-heading">{HEADING}</div>'
+        f'<div class="panel-body">{text}</div></div>'
+        for text in texts
+    )
+    return f"<html><body>{panels}</body></html>"
+
+
+@pytest.mark.asyncio
+async def test_parse_water_events_inserts_unknown_panels_below_known_ones():
+    texts = [f"Ջրանջատում {i}. 30.08.2024թ." for i in range(3)]
+    page = water_page(*texts)
+    digests = [compute_hash_by_text(f"{HEADING}\n\n{text}") for text in texts]
+    state = SimpleNamespace(watermark=None)
+    fetch_result = MagicMock(changed=True, html=page, state=state)
+    session = AsyncMock()
+    # The middle panel is already stored, the ones around it are new
+    unknown_digests = {digests[0], digests[2]}
+
+    with patch(
+        "parsers.water_parser.fetch_if_changed", AsyncMock(return_value=fetch_result)
+    ), patch(
+        "parsers.water_parser.filter_new_event_digests",
+        AsyncMock(return_value=unknown_digests),
+    ) as filter_new, patch(
+        "parsers.water_parser.bulk_insert_events", AsyncMock(return_value=[1, 2])
+    ) as bulk_insert, patch(
+        "parsers.water_parser.filter_by_date", return_value=True
+    ), patch(
+        "parsers.water_parser.area_matcher.find_best", AsyncMock(return_value=None)
+    ):
+        await parse_water_events(session)
+        inserted = bulk_insert.await_args.args[1]
+
+        assert [event["digest"] for event in inserted] == [digests[2], digests[0]]
+        assert state.watermark["top_panel"] == digests[0].hex()
+        assert state.watermark["panel_count"] == 3
+
+        await parse_water_events(session)
+
+    filter_new.assert_awaited_once()
+    bulk_insert.assert_awaited_once()
@@ -0,0 +1,134 @@
+import asyncio
+from collections import Counter, OrderedDict
+from datetime import datetime
+import hashlib
+import logging
+import re
+import unicodedata
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.future import select
+from config import TRANSLATION_MEMORY_SIZE
+from db import session_scope
+from models import TranslationMemoryEntry
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_source_text(text):
+    """
+    Builds the lookup form of a source text: NFC, collapsed spaces, stripped.
+    Line breaks are kept since they separate translated sections.
+    """
+    text = unicodedata.normalize("NFC", str(text))
+    return re.sub(r"[^\S\n]+", " ", text).strip()
+
+
+def source_digest(normalized_text):
+    """
+    Returns the fixed-size lookup key of a normalized source text.
+    """
+    return hashlib.blake2b(
+        normalized_text.encode("utf-8"), digest_size=16, person=b"translation-mem"
+    ).digest()
+
+
+class TranslationMemory:
+    """
+    Remembers translations by (normalized source text, source language, target language).
+
+    Lookups go to an in-process LRU first and to the `translation_memory` table next;
+    only a miss in both calls the translator. Concurrent requests for the same key
+    share one translator call.
+    """
+
+    def __init__(self, max_size=TRANSLATION_MEMORY_SIZE):
+        self.max_size = max_size
+        self.cache = OrderedDict()
+        self.stats = Counter()
+        self._pending = {}
+
+    def _remember(self, key, translation):
+        self.cache[key] = translation
+        self.cache.move_to_end(key)
+        if len(self.cache) > self.max_size:
+            self.cache.popitem(last=False)
+
+    def get_cached(self, text, source_lang, target_lang):
+        """
+        Returns the translation from the in-process cache or None, without any I/O.
+        """
+        key = (normalize_source_text(text), source_lang, target_lang)
+        translation = self.cache.get(key)
+        if translation is not None:
+            self.cache.move_to_end(key)
+            self.stats["hits"] += 1
+        return translation
+
+    async def _load(self, key):
+        try:
+            async with session_scope() as session:
+                result = await session.execute(
+                    select(TranslationMemoryEntry.translation).filter_by(
+                        source_digest=source_digest(key[0]),
+                        source_language=key[1],
+                        target_language=key[2],
+                    )
+                )
+                return result.scalars().first()
+        except Exception as e:
+            logger.warning(f"Translation memory lookup failed: {e}")
+            return None
+
+    async def _store(self, key, translation):
+        try:
+            async with session_scope() as session:
+                await session.execute(
+                    insert(TranslationMemoryEntry)
+                    .values(
+                        source_text=key[0],
+                        source_digest=source_digest(key[0]),
+                        source_language=key[1],
+                        target_language=key[2],
+                        translation=translation,
+                        created=datetime.now(),
+                    )
+                    .on_conflict_do_nothing(
+                        constraint="uq_translation_memory_source_target"
+                    )
+                )
+        except Exception as e:
+            logger.warning(f"Translation memory store failed: {e}")
+
+    async def _resolve(self, key, text, translator):
+        translation = await self._load(key)
+        if translation is not None:
+            self.stats["db_hits"] += 1
+        else:
+            self.stats["misses"] += 1
+            translation = await translator(text, key[1], key[2])
+            await self._store(key, translation)
+
+        self._remember(key, translation)
+        return translation
+
+    async def translate(self, text, source_lang, target_lang, translator):
+        """
+        Returns the remembered translation of `text` or calls
+        `await translator(text, source_lang, target_lang)` and remembers its result.
+        Translator errors propagate and nothing is remembered for them.
+        """
+        translation = self.get_cached(text, source_lang, target_lang)
+        if translation is not None:
+            return translation
+
+        key = (normalize_source_text(text), source_lang, target_lang)
+        task = self._pending.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._resolve(key, text, translator))
+            self._pending[key] = task
+            task.add_done_callback(lambda _: self._pending.pop(key, None))
+
+        return await asyncio.shield(task)
+
+
+translation_memory = TranslationMemory()
@@ -0,0 +1,238 @@
+import re
+from models import Language
+
+# Armenian letter runs, with an optional trailing dot for abbreviations such as "Փ."
+ARMENIAN_TOKEN_RE = re.compile(r"[Ա-Ֆա-և]+\.?")
+
+HY_TO_EN = {
+    "Ա": "A",
+    "Բ": "B",
+    "Գ": "G",
+    "Դ": "D",
+    "Ե": "E",
+    "Զ": "Z",
+    "Է": "E",
+    "Ը": "Y",
+    "Թ": "T",
+    "Ժ": "ZH",
+    "Ի": "I",
+    "Լ": "L",
+    "Խ": "KH",
+    "Ծ": "TS",
+    "Կ": "K",
+    "Հ": "H",
+    "Ձ": "DZ",
+    "Ղ": "GH",
+    "Ճ": "CH",
+    "Մ": "M",
+    "Յ": "Y",
+    "Ն": "N",
+    "Շ": "SH",
+    "Ո": "O",
+    "Չ": "CH",
+    "Պ": "P",
+    "Ջ": "J",
+    "Ռ": "R",
+    "Ս": "S",
+    "Վ": "V",
+    "Տ": "T",
+    "Ր": "R",
+    "Ց": "TS",
+    "Ւ": "V",
+    "Փ": "P",
+    "Ք": "K",
+    "Օ": "O",
+    "Ֆ": "F",
+}
+
+HY_TO_RU = {
+    "Ա": "А",
+    "Բ": "Б",
+    "Գ": "Г",
+    "Դ": "Д",
+    "Ե": "Е",
+    "Զ": "З",
+    "Է": "Э",
+    "Ը": "Ы",
+    "Թ": "Т",
+    "Ժ": "Ж",
+    "Ի": "И",
+    "Լ": "Л",
+    "Խ": "Х",
+    "Ծ": "Ц",
+    "Կ": "К",
+    "Հ": "Г",
+    "Ձ": "ДЗ",
+    "Ղ": "Х",
+    "Ճ": "Ч",
+    "Մ": "М",
+    "Յ": "Й",
+    "Ն": "Н",
+    "Շ": "Ш",
+    "Ո": "О",
+    "Չ": "Ч",
+    "Պ": "П",
+    "Ջ": "ДЖ",
+    "Ռ": "Р",
+    "Ս": "С",
+    "Վ": "В",
+    "Տ": "Т",
+    "Ր": "Р",
+    "Ց": "Ц",
+    "Ւ": "В",
+    "Փ": "П",
+    "Ք": "К",
+    "Օ": "О",
+    "Ֆ": "Ф",
+}
+
+# Letter combinations and word-initial forms that differ from letter-by-letter output,
+# longer combinations are matched first
+HY_DIGRAPHS = {
+    Language.EN.text: {"ՈՒ": "U"},
+    Language.RU.text: {"ՅՈՒ": "Ю", "ՈՒ": "У", "ՅԱ": "Я", "ՅԵ": "Е"},
+}
+HY_DIGRAPH_LENGTHS = (3, 2)
+HY_INITIALS = {
+    Language.EN.text: {"Ե": "YE", "Ո": "VO"},
+    Language.RU.text: {"Ե": "Е", "Ո": "ВО"},
+}
+# The lowercase-only ligature "և", whose uppercase form is two letters
+HY_LIGATURES = {Language.EN.text: {"և": "EV"}, Language.RU.text: {"և": "ЕВ"}}
+HY_ALPHABETS = {Language.EN.text: HY_TO_EN, Language.RU.text: HY_TO_RU}
+
+# Address terms with a fixed translation, looked up before anything else
+ADDRESS_TERMS = {
+    "ՓՈՂՈՑ": {Language.EN.text: "STREET", Language.RU.text: "УЛИЦА"},
+    "Փ.": {Language.EN.text: "ST.", Language.RU.text: "УЛ."},
+    "ՊՈՂՈՏԱ": {Language.EN.text: "AVENUE", Language.RU.text: "ПРОСПЕКТ"},
+    "ՊՈՂ.": {Language.EN.text: "AVE.", Language.RU.text: "ПР."},
+    "ՆՐԲԱՆՑՔ": {Language.EN.text: "LANE", Language.RU.text: "ПЕРЕУЛОК"},
+    "ՓԱԿՈՒՂԻ": {Language.EN.text: "DEAD END", Language.RU.text: "ТУПИК"},
+    "ԹԱՂԱՄԱՍ": {Language.EN.text: "DISTRICT", Language.RU.text: "КВАРТАЛ"},
+    "ՇԱՐՔ": {Language.EN.text: "ROW", Language.RU.text: "РЯД"},
+    "ՄԻԿՐՈՇՐՋԱՆ": {Language.EN.text: "MICRODISTRICT", Language.RU.text: "МИКРОРАЙОН"},
+    "ԹԱՂ.": {Language.EN.text: "DISTR.", Language.RU.text: "КВАРТ."},
+    "ՇԵՆՔ": {Language.EN.text: "BUILDING", Language.RU.text: "ЗДАНИЕ"},
+    "ՔԱՂԱՔ": {Language.EN.text: "CITY", Language.RU.text: "ГОРОД"},
+    "ԳՅՈՒՂ": {Language.EN.text: "VILLAGE", Language.RU.text: "СЕЛО"},
+}
+
+# Frequent non-name words that still need a real translation
+COMMON_WORDS = {
+    "ԵՎ",
+    "ԵՒ",
+    "ՈՉ",
+    "ՀԱՐԱԿԻՑ",
+    "ԲՆԱԿԻՉ",
+    "ՄԱՍՆԱԿԻ",
+    "ՄԱՍՆԱԿԻՈՐԵՆ",
+    "ԱՄԲՈՂՋՈՒԹՅԱՄԲ",
+    "ԿՈՂՄ",
+    "ԶՈՒՅԳ",
+    "ԿԵՆՏ",
+}
+PLURAL_SUFFIXES = ("ՆԵՐ", "ԵՐ")
+
+
+def classify_token(token):
+    """
+    Classifies an uppercased Armenian token as "term", "word" or "name".
+
+    Terms have a fixed translation, words need a translator and everything else
+    (streets, districts, building letters) is a proper name to transliterate.
+    """
+    if token in ADDRESS_TERMS:
+        return "term"
+    word = token.rstrip(".")
+    if word in COMMON_WORDS or (len(word) > 4 and word.endswith(PLURAL_SUFFIXES)):
+        return "word"
+    return "name"
+
+
+def transliterate(text, target_language):
+    """
+    Transliterates the Armenian letters of `text` to Latin ("en") or Cyrillic ("ru").
+    Other characters are kept as they are.
+    """
+    alphabet = HY_ALPHABETS[target_language]
+    digraphs = HY_DIGRAPHS[target_language]
+    initials = HY_INITIALS[target_language]
+    ligatures = HY_LIGATURES[target_language]
+
+    result = []
+    i = 0
+    word_start = True
+    while i < len(text):
+        char = text[i]
+        upper = char.upper()
+        combination = next(
+            (
+                chunk
+                for chunk in (
+                    text[i : i + length].upper() for length in HY_DIGRAPH_LENGTHS
+                )
+                if chunk in digraphs
+            ),
+            None,
+        )
+
+        if char in ligatures:
+            output, step = ligatures[char], 1
+        elif combination:
+            output, step = digraphs[combination], len(combination)
+        elif upper in alphabet:
+            if word_start and upper in initials:
+                output = initials[upper]
+            else:
+                output = alphabet[upper]
+            step = 1
+        else:
+            result.append(char)
+            word_start = not char.isalpha()
+            i += 1
+            continue
+
+        if not char.isupper():
+            output = output.lower()
+        elif len(output) > 1 and text[i + step : i + step + 1].islower():
+            # A capital in a title-cased word, e.g. "Երևան" -> "Yerevan"
+            output = output.capitalize()
+        result.append(output)
+        word_start = False
+        i += step
+
+    return "".join(result)
+
+
+def common_words(text):
+    """
+    Returns the Armenian tokens of `text` that need a translator.
+    """
+    return [
+        token
+        for token in ARMENIAN_TOKEN_RE.findall(text.upper())
+        if classify_token(token) == "word"
+    ]
+
+
+def localize_armenian(text, target_language, word_translations=None):
+    """
+    Renders the Armenian fragments of `text` in `target_language`: address terms from
+    the table, common words from `word_translations`, proper names transliterated.
+    """
+    if target_language not in HY_ALPHABETS:
+        return text
+
+    word_translations = word_translations or {}
+
+    def replace(match):
+        token = match.group(0).upper()
+        kind = classify_token(token)
+        if kind == "term":
+            return ADDRESS_TERMS[token][target_language]
+        if kind == "word" and token in word_translations:
+            return word_translations[token]
+        return transliterate(match.group(0), target_language)
+
+    return ARMENIAN_TOKEN_RE.sub(replace, text)
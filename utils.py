@@ -1,27 +1,101 @@
 import asyncio
+from datetime import datetime
 import gettext
 import hashlib
-from enum import Enum
 import logging
 import os
 import re
-import unicodedata
-from deep_translator import GoogleTranslator
-import requests
-
-from config import CHANNEL_ID_EN, CHANNEL_ID_HY, CHANNEL_ID_RU
+from urllib.parse import quote
+from zoneinfo import ZoneInfo
+import aiohttp
+from bs4 import BeautifulSoup
+
+from config import (
+    CHANNEL_ID_EN,
+    CHANNEL_ID_HY,
+    CHANNEL_ID_RU,
+    EVENT_HASH_KEY,
+    TIMEZONE,
+    TRANSLATION_CONCURRENCY,
+    TRANSLATION_TIMEOUT,
+)
+from http_client import get_http_session
 from models import Language
+from normalization import (  # noqa: F401
+    detect_language_by_charset,
+    escape_markdown_v2,
+    normalize_text,
+    normalize_value,
+)
+from translation_memory import translation_memory
+from transliteration import common_words, localize_armenian
 
 logger = logging.getLogger(__name__)
 
-translator_ru = GoogleTranslator(source="auto", target="ru")
-translator_en = GoogleTranslator(source="auto", target="en")
+GOOGLE_TRANSLATE_URL = "https://translate.google.com/m"
+
+LOCAL_TIMEZONE = ZoneInfo(TIMEZONE)
+OUTAGE_TIME_FORMAT = "%d.%m.%Y %H:%M"
+# Natural sort keys pad digit runs to this width, longer numbers sort as text
+NATURAL_SORT_WIDTH = 10
+NATURAL_SORT_DIGITS_RE = re.compile(r"\d+")
+
+EVENT_HASH_VERSION = 1
+EVENT_HASH_SIZE = 16
+EVENT_HASH_PERSON = b"outage-event"
+LINGVA_TRANSLATE_URL = "https://lingva.ml/api/v1/{source}/{target}/{text}"
+
+# Limits of translation requests in flight. Post generation and ingest have
+# separate permits, so slow post translations never hold up ingest
+translation_semaphore = asyncio.Semaphore(TRANSLATION_CONCURRENCY)
+ingest_translation_semaphore = asyncio.Semaphore(TRANSLATION_CONCURRENCY)
+
+
+async def google_translate(text, target_lang, source_lang="auto"):
+    """
+    Translate text with Google Translate through the translation memory.
+    """
+    text = text.strip()
+    if not text:
+        return text
+
+    return await translation_memory.translate(
+        text, source_lang, target_lang, request_google_translation
+    )
+
+
+async def request_google_translation(text, source_lang, target_lang):
+    """
+    Translate text with the Google Translate mobile page over the shared HTTP session.
+    The timeout only covers the request, not the wait for the translation semaphore.
+    """
+    params = {"sl": source_lang, "tl": target_lang, "q": text}
+    async with translation_semaphore:
+        async with get_http_session().get(
+            GOOGLE_TRANSLATE_URL,
+            params=params,
+            timeout=aiohttp.ClientTimeout(total=TRANSLATION_TIMEOUT),
+        ) as response:
+            if response.status != 200:
+                raise RuntimeError(
+                    f"Google Translate returned status {response.status} for {target_lang}"
+                )
+            html = await response.text()
+
+    soup = BeautifulSoup(html, "html.parser")
+    element = soup.find("div", {"class": "t0"}) or soup.find(
+        "div", {"class": "result-container"}
+    )
+    if not element:
+        raise RuntimeError(f"No translation found in Google Translate response: {text}")
+
+    return element.get_text(strip=True)
 
 
 async def translate_text(text):
-    loop = asyncio.get_event_loop()
-    translation_ru = await loop.run_in_executor(None, translator_ru.translate, text)
-    translation_en = await loop.run_in_executor(None, translator_en.translate, text)
+    translation_ru, translation_en = await asyncio.gather(
+        google_translate(text, "ru"), google_translate(text, "en")
+    )
     return translation_ru, translation_en
 
 
@@ -42,143 +116,142 @@ def get_translation():
     return translations
 
 
-def lingva_translate(text, source_lang="hy", target_lang=None):
+class TranslationUnavailableError(RuntimeError):
     """
-    Translate text using Lingva Translate API.
+    Raised when values could not be fully translated and should be retried later.
+    """
+
+
+async def lingva_translate(text, source_lang="hy", target_lang=None):
+    """
+    Translate text using Lingva Translate API, falling back to the source text.
     """
     if not target_lang:
         return text
 
-    url = f"https://lingva.ml/api/v1/{source_lang}/{target_lang}/{text}"
-
     try:
-        response = requests.get(url)
-        response.raise_for_status()
-        translation_data = response.json()
-        return translation_data["translation"]
+        return await translation_memory.translate(
+            text, source_lang, target_lang, request_lingva_translation
+        )
+    except asyncio.TimeoutError:
+        logger.error(
+            f"Lingva Translate timed out after {TRANSLATION_TIMEOUT} seconds: {text}"
+        )
+        return text
     except Exception as e:
         logger.error(f"Error with Lingva Translate: {e}")
         return text
 
 
-def normalize_text(value):
+async def request_lingva_translation(text, source_lang, target_lang):
     """
-    Normalize the input value by applying Unicode normalization and
-    converting to uppercase.
-
-    Handles different input types (strings, enums) and removes extra spaces.
+    Request a translation from the Lingva Translate API over the shared HTTP session.
+    The timeout only covers the request, not the wait for the translation semaphore.
     """
-    # Handle None input
-    if value is None:
-        return ""
+    url = LINGVA_TRANSLATE_URL.format(
+        source=source_lang, target=target_lang, text=quote(text, safe="")
+    )
 
-    # Convert Enums to their name representation or ensure the value is a string
-    if isinstance(value, Enum):
-        value = value.name.upper()
-    else:
-        value = str(value).strip().upper()
+    async with ingest_translation_semaphore:
+        async with get_http_session().get(
+            url, timeout=aiohttp.ClientTimeout(total=TRANSLATION_TIMEOUT)
+        ) as response:
+            response.raise_for_status()
+            translation_data = await response.json()
+            return translation_data["translation"]
 
-    # Apply Unicode normalization to the string
-    value = unicodedata.normalize("NFC", value)
-    value = re.sub(r"\s+", " ", value)  # Replace multiple spaces with a single space
 
-    return value
+def needs_translation(value, target_language):
+    """
+    Checks whether a normalized value still contains Armenian text that should be
+    translated to `target_language`.
+    """
+    return (
+        bool(value)
+        and bool(target_language)
+        and target_language != Language.HY.text
+        and detect_language_by_charset(value) == Language.HY
+    )
 
 
-def normalize_and_translate_value(value, target_language=None):
+async def translate_values(values, target_language):
     """
-    Normalize and optionally translate the input value.
+    Translate the distinct Armenian values to `target_language`.
 
-    Applies normalization and corrections for common mistakes, then translates
-    if a target language is specified.
-    """
-    # Normalize the value
-    value = normalize_text(value)
+    Address terms and proper names are rendered offline by the transliteration
+    engine. Only tokens classified as common words go to the translator, at most
+    once per unique word and bounded by TRANSLATION_TIMEOUT. Returns a mapping of
+    value to translation; values that do not need translation are left out.
 
-    # Apply corrections specific to translation
-    corrections = {
-        "ШАРК": "РЯД",
-        "SHARQ": "ROW",
-        "МИКРОШРДЖАН": "МИКРОРАЙОН",
-        "MIKROSHRDJAN": "MICRODISTRICT",
+    Raises TranslationUnavailableError when any word could not be translated, so
+    the caller defers its rows instead of storing and hashing partial translations.
+    """
+    pending = sorted({v for v in values if needs_translation(v, target_language)})
+    if not pending:
+        return {}
+
+    words = sorted({word for value in pending for word in common_words(value)})
+    if words:
+        logger.debug(
+            f"Translating {len(words)} words from Armenian to {target_language}"
+        )
+    translated_words = await asyncio.gather(
+        *(
+            translation_memory.translate(
+                word, Language.HY.text, target_language, request_lingva_translation
+            )
+            for word in words
+        ),
+        return_exceptions=True,
+    )
+    failed = [
+        word
+        for word, translation in zip(words, translated_words)
+        if isinstance(translation, Exception)
+    ]
+    if failed:
+        raise TranslationUnavailableError(
+            f"Could not translate {len(failed)} of {len(words)} words "
+            f"to {target_language}: {', '.join(failed[:5])}"
+        )
+
+    word_translations = {
+        word: normalize_text(translation)
+        for word, translation in zip(words, translated_words)
+        if translation != word
     }
 
-    if isinstance(value, str):
-        for wrong, correct in corrections.items():
-            if wrong in value:
-                value = value.replace(wrong, correct)
+    return {
+        value: localize_armenian(value, target_language, word_translations)
+        for value in pending
+    }
 
-    # Detect language and translate if needed
-    if target_language:
-        detected_language = detect_language_by_charset(value)
-        logger.debug(f"Detected language: {detected_language}")
 
-        # Translate any remaining untranslated Armenian words
-        if (
-            detected_language == Language.HY.name.lower()
-            and target_language != Language.HY.name.lower()
-        ):
-            logger.debug(f"Translating {value} from Armenian to {target_language}")
-            value = lingva_translate(value, Language.HY.name.lower(), target_language)
+def compute_event_digest(*fields):
+    """
+    Computes the 16-byte event digest with keyed blake2b.
 
-    return value
+    The version byte and the length prefix of every field are hashed too, so
+    ("AB", "C") and ("A", "BC") never collide. Bump EVENT_HASH_VERSION together
+    with a backfill migration whenever the input layout changes.
+    """
+    digest = hashlib.blake2b(
+        digest_size=EVENT_HASH_SIZE, key=EVENT_HASH_KEY, person=EVENT_HASH_PERSON
+    )
+    digest.update(bytes((EVENT_HASH_VERSION,)))
+    for field in fields:
+        encoded = field.encode("utf-8")
+        digest.update(len(encoded).to_bytes(4, "big"))
+        digest.update(encoded)
+    return digest.digest()
 
 
 def compute_hash(*args):
-    clean_args = [normalize_and_translate_value(arg) if arg else "" for arg in args]
-    concatenated = "".join(clean_args)
-    return compute_hash_by_text(concatenated)
+    return compute_event_digest(*(normalize_value(arg) if arg else "" for arg in args))
 
 
 def compute_hash_by_text(text):
-    return hashlib.md5(text.encode("utf-8")).hexdigest()
-
-
-def escape_markdown_v2(text):
-    """
-    Replaces all dash variants with a regular hyphen and escapes special characters in the text for correct rendering in MarkdownV2.
-
-    Args:
-        text (str): The text to be escaped.
-
-    Returns:
-        str: The escaped text ready for MarkdownV2.
-    """
-    # Replace all dash variants with a regular hyphen
-    text = text.replace("—", "-")  # em-dash
-    text = text.replace("–", "-")  # en-dash
-    text = text.replace("−", "-")  # minus sign (not a hyphen)
-
-    special_characters = [
-        "_",
-        "*",
-        "[",
-        "]",
-        "(",
-        ")",
-        "~",
-        "`",
-        ">",
-        "#",
-        "+",
-        "-",
-        "=",
-        "|",
-        "{",
-        "}",
-        ".",
-        "!",
-    ]
-
-    # Replace non-breaking spaces with regular spaces
-    text = text.replace("\u00A0", " ")
-
-    # Escape all special characters
-    escaped_text = text
-    for char in special_characters:
-        escaped_text = escaped_text.replace(char, f"\\{char}")
-
-    return escaped_text
+    return compute_event_digest(text)
 
 
 def combine_date_time(date_str, time_str):
@@ -192,6 +265,48 @@ def combine_date_time(date_str, time_str):
     return f"{date_str} {time_str}"
 
 
+def local_now():
+    """
+    Returns the current timezone-aware time in the local time zone.
+    """
+    return datetime.now(LOCAL_TIMEZONE)
+
+
+def parse_outage_time(value):
+    """
+    Parses a 'DD.MM.YYYY HH:MM' string as a timezone-aware local datetime.
+    Returns None if the value does not match the format.
+    """
+    try:
+        return datetime.strptime(value, OUTAGE_TIME_FORMAT).replace(
+            tzinfo=LOCAL_TIMEZONE
+        )
+    except (TypeError, ValueError):
+        return None
+
+
+def format_outage_time(value):
+    """
+    Formats a timezone-aware datetime as 'DD.MM.YYYY HH:MM' in the local time zone.
+    """
+    if value is None:
+        return ""
+    return value.astimezone(LOCAL_TIMEZONE).strftime(OUTAGE_TIME_FORMAT)
+
+
+def format_outage_window(start_time, end_time):
+    """
+    Formats an outage window as 'DD.MM.YYYY HH:MM-HH:MM' in the local time zone.
+    Returns None unless both ends are known.
+    """
+    if start_time is None or end_time is None:
+        return None
+    return (
+        f"{format_outage_time(start_time)}-"
+        f"{end_time.astimezone(LOCAL_TIMEZONE).strftime('%H:%M')}"
+    )
+
+
 def get_channel_id(language):
     channel_mapping = {
         Language.HY: CHANNEL_ID_HY,
@@ -202,36 +317,23 @@ def get_channel_id(language):
     return channel_mapping.get(language)
 
 
-def natural_sort_key(s):
+def natural_sort_key(value):
     """
     Generate a sort key for natural sorting.
-    Splits a string into a list of integers and strings, ensuring that numbers are sorted numerically.
+    Digit runs are zero-padded so that plain string comparison of the keys, in Python
+    or with the "C" collation in Postgres, orders numbers numerically.
     """
-    return [
-        int(text) if text.isdigit() else text.lower() for text in re.split(r"(\d+)", s)
-    ]
+    return NATURAL_SORT_DIGITS_RE.sub(
+        lambda match: match.group().zfill(NATURAL_SORT_WIDTH), value.lower()
+    )
 
 
-def detect_language_by_charset(text):
+def split_house_numbers(house_numbers):
     """
-    Detects language by checking the character set of the text.
-    Returns 'en' for English, 'ru' for Russian, 'hy' for Armenian, or None if undetermined.
+    Splits a comma-separated list of house numbers into the unique numbers in natural
+    order and their natural sort keys.
     """
-
-    cyrillic_chars = set(
-        "АБВГДЕЁЖЗИЙКЛМНОПРСТУФХЦЧШЩЪЫЬЭЮЯабвгдеёжзийклмнопрстуфхцчшщъыьэюя"
-    )
-    armenian_chars = set(
-        "ԱԲԳԴԵԶԷԸԹԺԻԼԽԾԿՀՁՂՃՄՅՆՇՈՉՊՋՌՍՎՏՐՑՒՓՔՕՖաաբգդեզէըթժիլխծկհձղճմյնշոչպջռսվտրցւփքօֆ"
-    )
-
-    text_chars = set(text.replace(" ", ""))
-
-    if text_chars & armenian_chars:
-        return Language.HY
-    elif text_chars & cyrillic_chars:
-        return Language.RU
-    elif any("a" <= c <= "z" or "A" <= c <= "Z" for c in text):
-        return Language.EN
-    else:
-        return None
+    numbers = {number.strip() for number in (house_numbers or "").split(",")}
+    numbers.discard("")
+    numbers = sorted(numbers, key=lambda number: (natural_sort_key(number), number))
+    return numbers, [natural_sort_key(number) for number in numbers]